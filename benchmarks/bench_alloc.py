@@ -0,0 +1,108 @@
+"""Allocations per poll across a fleet of simulated vehicles, with tracemalloc.
+
+Before: entities decode and fan out on their own and every state update
+merges the converter option again. After: the coordinator decodes once,
+entities get the changed values only and resolve options at creation.
+
+    python benchmarks/bench_alloc.py [--vehicles 10] [--polls 30]
+"""
+import argparse
+import asyncio
+import contextlib
+import statistics
+import tracemalloc
+from collections import Counter
+
+from common import HomeAssistant, async_make_vehicle, drive, legacy_poll, wuling
+
+
+def legacy_set_state(self, data: dict):
+    """XEntity.async_set_state as it was, option merge and full attrs loop."""
+    if hasattr(self.conv, 'option'):
+        self._option.update(self.conv.option or {})
+    if self.attr in data:
+        self._attr_state = data[self.attr]
+        self._attr_entity_picture = self._option.get('entity_picture')
+    for k in self.subscribed_attrs:
+        if k not in data:
+            continue
+        self._attr_extra_state_attributes[k] = data[k]
+
+
+@contextlib.contextmanager
+def legacy_entities():
+    current = wuling.XEntity.async_set_state
+    wuling.XEntity.async_set_state = legacy_set_state
+    try:
+        yield
+    finally:
+        wuling.XEntity.async_set_state = current
+
+
+def current_poll(coordinator, entities):
+    coordinator.async_update_listeners()
+
+
+def measure(poll, fleet, polls):
+    """Peak bytes above the poll start, net bytes and blocks kept after all polls."""
+    peaks = []
+    before = tracemalloc.take_snapshot()
+    for step in range(1, polls + 1):
+        for coordinator, entities in fleet:
+            drive(coordinator.data, step)
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for coordinator, entities in fleet:
+            poll(coordinator, entities)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start)
+    after = tracemalloc.take_snapshot()
+    diff = after.compare_to(before, 'filename')
+    kept = sum(d.size_diff for d in diff)
+    blocks = sum(d.count_diff for d in diff)
+    return peaks, kept, blocks
+
+
+async def async_make_fleet(hass, vehicles, writes):
+    return [await async_make_vehicle(hass, i, writes) for i in range(vehicles)]
+
+
+async def async_main(args):
+    hass = HomeAssistant(args.config_dir)
+    writes = Counter()
+    tracemalloc.start()
+    results = {}
+    with legacy_entities():
+        fleet = await async_make_fleet(hass, args.vehicles, writes)
+        writes.clear()
+        results['before'] = (*measure(legacy_poll, fleet, args.polls), writes['state_writes'])
+    fleet = await async_make_fleet(hass, args.vehicles, writes)
+    for coordinator, entities in fleet:
+        current_poll(coordinator, entities)  # first dispatch writes everything
+    writes.clear()
+    results['after'] = (*measure(current_poll, fleet, args.polls), writes['state_writes'])
+    tracemalloc.stop()
+
+    entities = sum(len(e) for _, e in fleet)
+    print(f'{args.vehicles} vehicles, {entities} entities, {args.polls} polls')
+    print(f'{"":8} {"peak KiB/poll":>14} {"max KiB":>9} {"kept KiB":>9} {"kept blocks":>12} {"writes/poll":>12}')
+    for name, (peaks, kept, blocks, state_writes) in results.items():
+        print(
+            f'{name:8} {statistics.mean(peaks) / 1024:14.1f} {max(peaks) / 1024:9.1f} '
+            f'{kept / 1024:9.1f} {blocks:12d} {state_writes / args.polls:12.1f}'
+        )
+    before, after = statistics.mean(results['before'][0]), statistics.mean(results['after'][0])
+    print(f'peak per poll: {before / after:.1f}x lower')
+    await hass.async_stop(force=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=10)
+    parser.add_argument('--polls', type=int, default=30)
+    parser.add_argument('--config-dir', default='/tmp/wuling-bench')
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Per-poll decode and dispatch cost against the number of entities.
+
+Legacy: each entity handled the coordinator update itself, decoded every
+converter and pushed the full payload through all entities, so a poll cost
+entities x (decode + entities). Current: the coordinator decodes once and
+only the entities subscribed to changed attributes are written.
+
+    python benchmarks/bench_dispatch.py [--polls 50]
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from common import HomeAssistant, async_make_vehicle, drive, legacy_poll
+
+
+def current_poll(coordinator, entities):
+    coordinator.async_update_listeners()
+
+
+def measure(poll, coordinator, entities, writes, polls):
+    writes.clear()
+    started = time.perf_counter()
+    for step in range(1, polls + 1):
+        drive(coordinator.data, step)
+        poll(coordinator, entities)
+    elapsed = time.perf_counter() - started
+    return elapsed / polls * 1e6, writes['state_writes'] / polls
+
+
+async def async_main(args):
+    hass = HomeAssistant(args.config_dir)
+    writes = Counter()
+    _, all_entities = await async_make_vehicle(hass, 0, writes)
+    total = len(all_entities)
+    sizes = sorted({n for n in (5, 10, 20, 40, total) if n <= total})
+    print(f'{args.polls} polls of a driving car, {total} entities at most')
+    print(f'{"entities":>8} {"legacy us/poll":>15} {"writes":>7} {"current us/poll":>16} {"writes":>7} {"ratio":>7}')
+    rows = []
+    for size in sizes:
+        legacy_vehicle = await async_make_vehicle(hass, size, writes, limit=size)
+        legacy_us, legacy_writes = measure(legacy_poll, *legacy_vehicle, writes, args.polls)
+        current_vehicle = await async_make_vehicle(hass, size, writes, limit=size)
+        current_poll(*current_vehicle)  # first dispatch writes everything
+        current_us, current_writes = measure(current_poll, *current_vehicle, writes, args.polls)
+        rows.append((size, legacy_us, current_us))
+        print(
+            f'{size:8d} {legacy_us:15.1f} {legacy_writes:7.0f} '
+            f'{current_us:16.1f} {current_writes:7.1f} {legacy_us / current_us:6.1f}x'
+        )
+    (n0, legacy0, current0), (n1, legacy1, current1) = rows[0], rows[-1]
+    print(
+        f'cost growth for {n1 / n0:.0f}x entities: legacy {legacy1 / legacy0:.1f}x, '
+        f'current {current1 / current0:.1f}x'
+    )
+    await hass.async_stop(force=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--polls', type=int, default=50)
+    parser.add_argument('--config-dir', default='/tmp/wuling-bench')
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Micro-benchmark of converter property lookups on a recorded status payload.
+
+Compares the string-splitting ``get_value`` the converters used to call on
+every decode with the path compiled once per converter (``Converter.path``
+read through ``get_path_value``). Runs without Home Assistant installed:
+
+    python benchmarks/bench_get_value.py [--number 2000]
+"""
+import argparse
+import importlib.util
+import json
+import re
+import sys
+import timeit
+import types
+from enum import Enum
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = ROOT / 'custom_components' / 'wuling'
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+
+def stub_homeassistant():
+    """The two names converters/base.py imports, when hass is not installed."""
+    try:
+        import homeassistant.const  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    class EntityCategory(str, Enum):
+        CONFIG = 'config'
+        DIAGNOSTIC = 'diagnostic'
+
+    class BinarySensorDeviceClass(str, Enum):
+        PROBLEM = 'problem'
+
+    modules = {
+        'homeassistant': types.ModuleType('homeassistant'),
+        'homeassistant.const': types.ModuleType('homeassistant.const'),
+        'homeassistant.components': types.ModuleType('homeassistant.components'),
+        'homeassistant.components.binary_sensor': types.ModuleType('homeassistant.components.binary_sensor'),
+    }
+    modules['homeassistant.const'].EntityCategory = EntityCategory
+    modules['homeassistant.components.binary_sensor'].BinarySensorDeviceClass = BinarySensorDeviceClass
+    sys.modules.update(modules)
+
+
+def load_converters():
+    stub_homeassistant()
+    spec = importlib.util.spec_from_file_location('wuling_converters_base', PACKAGE / 'converters' / 'base.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_get_value(obj, key, def_value=None):
+    """converters/base.get_value before paths were compiled."""
+    keys = f'{key}'.split('.')
+    result = obj
+    for k in keys:
+        if result is None:
+            return None
+        if isinstance(result, dict):
+            result = result.get(k, def_value)
+        if isinstance(result, (list, tuple)):
+            try:
+                result = result[int(key)]
+            except Exception:
+                result = def_value
+    return result
+
+
+def converter_props():
+    """Every prop of the shipped converters, the paths one decode reads."""
+    source = (PACKAGE / '__init__.py').read_text(encoding='utf-8')
+    return sorted(set(re.findall(r"prop='([^']+)'", source)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000, help='decodes per measurement')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    base = load_converters()
+    data = json.loads((FIXTURES / 'queryDefaultCarStatus.json').read_text(encoding='utf-8'))['data']
+    data['checkStatus'] = json.loads((FIXTURES / 'checkAll.json').read_text(encoding='utf-8'))['data']
+    data['tirePressure'] = json.loads((FIXTURES / 'tirePressure.json').read_text(encoding='utf-8'))['data']
+    data['client'] = {'breaker': 'closed', 'failures': 0, 'poll_ms': 12.5}
+    props = converter_props()
+    converters = [base.Converter(p.replace('.', '_'), prop=p) for p in props]
+
+    for conv in converters:
+        expected = legacy_get_value(data, conv.prop)
+        assert conv.get_value(data) == expected, conv.prop
+    # list segments index with the segment, the legacy lookup used the whole key
+    indexed = {'a': [{'b': 1}, {'b': 2}]}
+    assert base.get_value(indexed, 'a.1.b') == 2
+    assert legacy_get_value(indexed, 'a.1.b') is None
+
+    def run_legacy():
+        for conv in converters:
+            legacy_get_value(data, conv.prop)
+
+    def run_uncompiled():
+        for conv in converters:
+            base.get_value(data, conv.prop)
+
+    def run_compiled():
+        get_path_value = base.get_path_value
+        for conv in converters:
+            get_path_value(data, conv.path)
+
+    print(f'{len(props)} converter paths per decode, {args.number} decodes x {args.repeat} repeats')
+    results = {}
+    for name, func in [
+        ('legacy split per call', run_legacy),
+        ('get_value (compiles per call)', run_uncompiled),
+        ('compiled Converter.path', run_compiled),
+    ]:
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        results[name] = best
+        per_lookup = best / args.number / len(props) * 1e9
+        print(f'  {name:32} {best / args.number * 1e6:8.2f} us/decode  {per_lookup:7.1f} ns/lookup')
+    legacy = results['legacy split per call']
+    compiled = results['compiled Converter.path']
+    print(f'speedup compiled vs legacy: {legacy / compiled:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Replay polls of a simulated fleet against the local openapi stand-in.
+
+Each vehicle is a ``StateCoordinator`` with the entities of all platforms,
+refreshed through the real request, decode and dispatch path. The server
+runs in a child process, so the CPU time is the integration's own.
+
+    python benchmarks/bench_replay.py [--vehicles 10] [--polls 30] [--latency 0.05] [--error-rate 0.02]
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+
+from common import HomeAssistant, async_make_vehicle, wuling
+from fake_openapi import serve
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if len(values) < 2:
+        return dict.fromkeys(points, values[0] if values else 0)
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {p: cuts[p - 1] for p in points}
+
+
+async def async_timed_refresh(coordinator, latencies):
+    started = time.perf_counter()
+    await coordinator.async_refresh()
+    latencies.append((time.perf_counter() - started) * 1000)
+    return coordinator.last_update_success
+
+
+async def async_poll_round(fleet, step, args, latencies):
+    for coordinator, _ in fleet:
+        # rounds stand for polls a minute apart: the status cache has expired
+        coordinator.invalidate_cache()
+        if step % args.sub_every == 0:
+            coordinator._sub_updated.clear()
+    return await asyncio.gather(*[
+        async_timed_refresh(coordinator, latencies)
+        for coordinator, _ in fleet
+    ])
+
+
+async def async_main(args, api_base):
+    hass = HomeAssistant(args.config_dir)
+    writes = Counter()
+    fleet = []
+    for i in range(args.vehicles):
+        coordinator, entities = await async_make_vehicle(hass, i, writes, options={wuling.CONF_API_BASE: api_base})
+        coordinator.fleet.coordinators[coordinator.entry.entry_id] = coordinator
+        fleet.append((coordinator, entities))
+    entities = sum(len(e) for _, e in fleet)
+
+    latencies = []
+    results = Counter()
+    await async_poll_round(fleet, 0, args, [])  # connections and first full dispatch
+    writes.clear()
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for step in range(1, args.polls + 1):
+        results.update(await async_poll_round(fleet, step, args, latencies))
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    polls = args.polls * args.vehicles
+    state_writes = writes['state_writes']
+
+    peaks = []
+    tracemalloc.start()
+    for step in range(args.polls + 1, args.polls + 1 + args.alloc_polls):
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await async_poll_round(fleet, step, args, [])
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append((peak - start) / args.vehicles)
+    tracemalloc.stop()
+
+    command_ms = []
+    if args.commands:
+        for coordinator, _ in fleet:
+            started = time.perf_counter()
+            await coordinator.async_search_car()
+            command_ms.append((time.perf_counter() - started) * 1000)
+
+    stats = Counter()
+    decode_ms = []
+    for coordinator, _ in fleet:
+        stats.update(coordinator.stats)
+        if timing := coordinator.timings.get('decode'):
+            decode_ms.append(timing.total / timing.count)
+
+    print(f'{args.vehicles} vehicles, {entities} entities, {args.polls} polls each, '
+          f'latency {args.latency * 1000:.0f} ms, error rate {args.error_rate:.0%}')
+    pct = percentiles(latencies)
+    print(f'refresh latency ms    p50 {pct[50]:8.2f}  p90 {pct[90]:8.2f}  p99 {pct[99]:8.2f}  max {max(latencies):8.2f}')
+    print(f'cpu per poll ms       {cpu / polls * 1000:8.3f}  ({cpu:.2f}s cpu in {wall:.2f}s wall)')
+    if decode_ms:
+        print(f'decode ms             {statistics.mean(decode_ms):8.3f}')
+    if peaks:
+        print(f'alloc peak per poll   {statistics.mean(peaks) / 1024:8.1f} KiB  max {max(peaks) / 1024:.1f} KiB')
+    print(f'state writes per poll {state_writes / polls:8.1f}  of {entities / args.vehicles:.0f} entities')
+    print(f'failed polls          {results[False]:8d}  of {polls}')
+    print('requests              ' + ', '.join(
+        f'{k} {stats[k]}' for k in ('requests_issued', 'requests_retried', 'requests_coalesced', 'cache_hits')
+    ))
+    if command_ms:
+        print(f'command latency ms    p50 {percentiles(command_ms)[50]:8.2f}')
+
+    await fleet[0][0].fleet.async_close()
+    await hass.async_stop(force=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=10)
+    parser.add_argument('--polls', type=int, default=30, help='timed polls per vehicle')
+    parser.add_argument('--alloc-polls', type=int, default=5, help='polls per vehicle traced by tracemalloc')
+    parser.add_argument('--sub-every', type=int, default=10, help='polls between check and tire refreshes')
+    parser.add_argument('--latency', type=float, default=0.02, help='mean server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of failed responses')
+    parser.add_argument('--commands', action='store_true', help='send one command per vehicle at the end')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--config-dir', default='/tmp/wuling-bench')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve, args=(queue, args.latency, args.error_rate, args.seed), daemon=True,
+    )
+    server.start()
+    try:
+        asyncio.run(async_main(args, queue.get(timeout=30)))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Config entry setup time for one and for ten vehicles.
+
+Each run starts a bare Home Assistant core (registries, http and webhook,
+no frontend) in a fresh config dir and adds the entries at once, as a
+restart does. The first refresh goes to the local openapi stand-in.
+Platforms add their entities in one batch, compared with one
+``async_add_entities`` call per entity.
+
+    python benchmarks/bench_setup.py [--vehicles 1 10] [--repeat 3]
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import tempfile
+import time
+
+from common import HomeAssistant, make_entry, wuling
+from fake_openapi import serve
+from homeassistant import auth, bootstrap, loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntryState
+from homeassistant.setup import async_setup_component
+
+
+def setup_platform_per_entity(self, domain: str, add_entities, new_entity):
+    """StateCoordinator.setup_platform with one add call per entity."""
+    self._platforms[domain] = (add_entities, new_entity)
+    for conv in self.registry.entities(domain):
+        if conv.attr in self._active:
+            add_entities([new_entity(conv)])
+
+
+async def async_core(config_dir: str) -> HomeAssistant:
+    """Home Assistant with what the integration and its platforms depend on."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    # http is set up but not started, no port is bound
+    for domain in ('homeassistant', 'http', 'webhook', *wuling.SUPPORTED_PLATFORMS):
+        assert await async_setup_component(hass, domain, {}), domain
+    return hass
+
+
+async def async_setup_time(vehicles: int, api_base: str):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_core(config_dir)
+        entries = [make_entry(i, {wuling.CONF_API_BASE: api_base}) for i in range(vehicles)]
+        started = time.perf_counter()
+        await asyncio.gather(*[hass.config_entries.async_add(entry) for entry in entries])
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - started
+        loaded = sum(entry.state is ConfigEntryState.LOADED for entry in entries)
+        states = len(hass.states.async_all())
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+    return elapsed * 1000, loaded, states
+
+
+async def async_main(args, api_base):
+    batched = wuling.StateCoordinator.setup_platform
+    modes = [('one batch per platform', batched)]
+    if not args.batched_only:
+        modes.append(('one call per entity', setup_platform_per_entity))
+    print(f'median of {args.repeat} runs')
+    for vehicles in args.vehicles:
+        for mode, setup_platform in modes:
+            wuling.StateCoordinator.setup_platform = setup_platform
+            runs = [await async_setup_time(vehicles, api_base) for _ in range(args.repeat)]
+            elapsed = statistics.median(r[0] for r in runs)
+            _, loaded, states = runs[-1]
+            print(
+                f'{vehicles:3d} vehicles, {mode:22}: {elapsed:8.1f} ms setup, '
+                f'{elapsed / vehicles:7.1f} ms per vehicle, {loaded} loaded, {states} states'
+            )
+    wuling.StateCoordinator.setup_platform = batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batched-only', action='store_true', help='skip the one call per entity runs')
+    parser.add_argument('--latency', type=float, default=0.0, help='mean server latency in seconds')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(queue, args.latency, 0.0), daemon=True)
+    server.start()
+    try:
+        asyncio.run(async_main(args, queue.get(timeout=30)))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == '__main__':
+    main()
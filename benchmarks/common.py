@@ -0,0 +1,107 @@
+"""Shared pieces of the benchmarks: recorded responses and simulated vehicles.
+
+Vehicles are real ``StateCoordinator`` instances with the entities of every
+platform attached, but no running Home Assistant: entities count their
+state writes instead of writing to the state machine.
+"""
+import copy
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+import custom_components.wuling as wuling  # noqa: E402
+from custom_components.wuling import (  # noqa: E402
+    binary_sensor, button, climate, device_tracker, lock, sensor, switch,
+)
+
+PLATFORMS = (sensor, binary_sensor, button, climate, lock, switch, device_tracker)
+
+
+def load_fixture(name: str) -> dict:
+    return json.loads((FIXTURES / f'{name}.json').read_text(encoding='utf-8'))
+
+
+def vin(index: int) -> str:
+    return f'LZWADAGA1KB{index:06d}'
+
+
+def vehicle_data(index: int) -> dict:
+    """Coordinator data of one car, as after a full refresh."""
+    data = copy.deepcopy(load_fixture('queryDefaultCarStatus')['data'])
+    data['carInfo']['vin'] = data['carStatus']['vin'] = vin(index)
+    data['checkStatus'] = load_fixture('checkAll')['data']
+    data['tirePressure'] = load_fixture('tirePressure')['data']
+    return data
+
+
+def drive(data: dict, step: int):
+    """Move the car along: what changes between two polls of a driving car."""
+    status = data['carStatus']
+    status['collectTime'] = 1700000000000 + step * 60000
+    status['mileage'] = f'{12345.6 + step * 0.8:.1f}'
+    status['batterySoc'] = str(max(5, 80 - step // 10))
+    status['latitude'] = f'{24.326412 + step * 0.0003:.6f}'
+    status['longitude'] = f'{109.428603 + step * 0.0002:.6f}'
+    status['invActTemp'] = f'{18.5 + step % 5 * 0.5:.1f}'
+
+
+def legacy_poll(coordinator, entities):
+    """One poll of the per-entity updates: each entity decoded and pushed to all."""
+    for _ in entities:
+        payload = coordinator.decode(coordinator.data)
+        attrs = payload.keys()
+        for entity in entities:
+            if not (entity.subscribed_attrs & attrs):
+                continue
+            entity.async_set_state(payload)
+            if entity.added:
+                entity.async_write_ha_state()
+
+
+def make_entry(index: int, options=None) -> ConfigEntry:
+    return ConfigEntry(
+        version=1, minor_version=1, domain=wuling.DOMAIN, title=f'bench {index}',
+        data={
+            wuling.CONF_ACCESS_TOKEN: f'token-{index}',
+            wuling.CONF_CLIENT_ID: 'client',
+            wuling.CONF_CLIENT_SECRET: 'secret',
+        },
+        source='user', options=options or {},
+    )
+
+
+async def async_make_vehicle(hass: HomeAssistant, index: int, writes: Counter, limit=None, options=None):
+    """Coordinator of one car with the entities of all platforms added."""
+    entry = make_entry(index, options)
+    coordinator = wuling.StateCoordinator(hass, entry)
+    coordinator.data.update(vehicle_data(index))
+    coordinator.discover_converters(())
+    hass.data[entry.entry_id] = {'coordinator': coordinator}
+    entities = []
+    for platform in PLATFORMS:
+        await platform.async_setup_entry(hass, entry, entities.extend)
+    if limit is not None:
+        # keep only the first entities, the coordinator indexes just those
+        entities = entities[:limit]
+        coordinator.entities = {}
+        coordinator.listeners = {}
+        for entity in entities:
+            coordinator.subscribe(entity)
+
+    def count_write():
+        writes['state_writes'] += 1
+
+    for entity in entities:
+        entity.added = True
+        entity.async_write_ha_state = count_write
+    coordinator.added_entities = len(entities)
+    return coordinator, entities
@@ -0,0 +1,104 @@
+"""Local stand-in of the openapi cloud, serves the recorded responses.
+
+Every access token is one car (``token-<n>`` of the benchmark entries), its
+status moves on with each status request. Latency and failures are injected:
+
+    python benchmarks/fake_openapi.py --port 8900 --latency 0.05 --error-rate 0.02
+
+and point the ``api_base`` option at ``http://127.0.0.1:8900/junApi/sgmw``.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import random
+from collections import Counter
+
+from aiohttp import web
+
+from common import drive, load_fixture, vin
+
+API_PREFIX = '/junApi/sgmw'
+RESPONSES = {
+    'userCarRelation/queryDefaultCarStatus': 'queryDefaultCarStatus',
+    'car/check/all': 'checkAll',
+    'car/info/tire/pressure': 'tirePressure',
+}
+
+
+class FakeOpenApi:
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.fixtures = {name: load_fixture(name) for name in (*RESPONSES.values(), 'control')}
+        self.steps = Counter()
+        self.stats = Counter()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route('*', API_PREFIX + '/{api:.+}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request):
+        api = request.match_info['api']
+        self.stats['requests'] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        if self.random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            return web.Response(status=503, text='injected failure')
+        token = request.headers.get('sgmwaccesstoken', '')
+        if not token.startswith('token-'):
+            return web.json_response({'errorCode': '500009', 'errorMessage': '登陆失效'})
+        index = int(token[6:])
+        await request.read()
+        if api == 'userCarRelation/queryDefaultCarStatus':
+            self.steps[index] += 1
+            result = copy.deepcopy(self.fixtures['queryDefaultCarStatus'])
+            data = result['data']
+            data['carInfo']['vin'] = data['carStatus']['vin'] = vin(index)
+            drive(data, self.steps[index])
+        elif api in RESPONSES:
+            result = self.fixtures[RESPONSES[api]]
+        elif api.startswith('car/control/'):
+            self.stats['commands'] += 1
+            result = self.fixtures['control']
+        else:
+            return web.Response(status=404)
+        return web.Response(body=json.dumps(result, ensure_ascii=False), content_type='application/json')
+
+
+async def async_start(server: FakeOpenApi, host='127.0.0.1', port=0):
+    """Serve in the running loop, return the runner and the api base url."""
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f'http://{host}:{port}{API_PREFIX}'
+
+
+def serve(port_queue, latency, error_rate, seed=None, port=0):
+    """Process target: serve until terminated, report the api base on the queue."""
+    async def main():
+        server = FakeOpenApi(latency, error_rate, seed)
+        _, api_base = await async_start(server, port=port)
+        port_queue.put(api_base)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='mean seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses failing with 503')
+    args = parser.parse_args()
+    server = FakeOpenApi(args.latency, args.error_rate)
+    web.run_app(server.app(), host='127.0.0.1', port=args.port, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
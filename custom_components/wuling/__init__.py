@@ -1,5 +1,7 @@
 import logging
+import asyncio
 import aiohttp
+from aiohttp import web
 import voluptuous as vol
 from datetime import timedelta
 import hashlib
@@ -7,27 +9,41 @@ import time
 import json
 import random
 import string
+from collections import Counter, OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-from .converters.base import NumberSensorConv, get_value
 from homeassistant.core import HomeAssistant, State, ServiceCall, SupportsResponse, callback
 from homeassistant.const import (
     Platform,
+    EVENT_HOMEASSISTANT_CLOSE,
     CONF_ACCESS_TOKEN,
     CONF_CLIENT_ID,
     CONF_CLIENT_SECRET,
+    CONF_WEBHOOK_ID,
     PERCENTAGE,
     UnitOfLength,
     UnitOfPressure,
     UnitOfTemperature,
     UnitOfElectricPotential,
+    UnitOfTime,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.components import webhook
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, CoordinatorEntity
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.util.dt import now
-from homeassistant.exceptions import IntegrationError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, CoordinatorEntity, UpdateFailed
+from homeassistant.util.ssl import get_default_context
+from homeassistant.util.dt import parse_datetime, as_utc
+from homeassistant.exceptions import ConfigEntryAuthFailed, IntegrationError
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.components.sensor import SensorStateClass, SensorDeviceClass
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 
 from .converters.base import *
 
@@ -36,6 +52,64 @@ DOMAIN = 'wuling'
 TITLE = '五菱汽车'
 API_BASE = 'https://openapi.baojun.net/junApi/sgmw'
 
+CONF_MQTT_TOPIC = 'mqtt_topic'
+CONF_MQTT_QOS = 'mqtt_qos'
+CONF_API_BASE = 'api_base'  # set programmatically for local stand-ins, never in the options form
+
+POLL_INTERVAL = timedelta(seconds=60)
+POLL_INTERVAL_ACTIVE = timedelta(seconds=20)
+POLL_INTERVAL_PARKED = timedelta(minutes=5)
+COMMAND_BOOST = timedelta(minutes=3)
+CONFIRM_INTERVAL = timedelta(seconds=5)
+CONFIRM_TIMEOUT = timedelta(seconds=60)
+COMMAND_SPACING = timedelta(seconds=2)
+POLL_INTERVAL_PUSH = timedelta(minutes=15)
+PUSH_TIMEOUT = timedelta(minutes=30)  # pushes count as live for this long
+PUSH_SECTIONS = ('carStatus', 'checkStatus', 'tirePressure')
+MQTT_BATCH_DELAY = 1  # seconds deltas are merged before publishing
+STALE_BACKOFF = 5  # unchanged snapshots in a row before backing off
+SUB_RESOURCE_CONCURRENCY = 2
+SUB_RESOURCES = {
+    # data key: (update method, refresh interval)
+    'checkStatus': ('async_update_check', timedelta(minutes=10)),
+    'tirePressure': ('async_update_tire', timedelta(minutes=10)),
+}
+READ_CACHE_SIZE = 32
+READ_CACHE_TTL = {
+    # read-only endpoint: seconds a response may be served from cache
+    'userCarRelation/queryDefaultCarStatus': 10,
+    'car/check/all': 60,
+    'car/info/tire/pressure': 60,
+}
+# reads that are safe to retry and to share between concurrent callers
+IDEMPOTENT_READS = frozenset([
+    'userCarRelation/queryDefaultCarStatus',
+    'car/check/all',
+    'car/info/tire/pressure',
+])
+CONTROL_INVALIDATES = ('userCarRelation/queryDefaultCarStatus',)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1  # seconds, doubled per attempt plus jitter
+BREAKER_THRESHOLD = 5  # consecutive upstream failures before opening
+BREAKER_COOLDOWN = timedelta(minutes=5)
+FLEET_CONCURRENCY = 4  # requests of all vehicles on the wire at the same time
+CONNECTION_LIMIT_PER_HOST = 4
+DNS_CACHE_TTL = 300  # seconds
+KEEPALIVE_TIMEOUT = 60  # seconds
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10, sock_read=20)
+MAX_RESPONSE_SIZE = 2 * 1024 * 1024  # bytes
+POLL_STATE_ATTRS = ('key_status', 'charging', 'gear_status', 'collect_time', 'ac', 'door_lock')
+CLIENT_STATE_ATTRS = ('api_status', 'api_failures', 'poll_duration')
+# refreshes of a non-empty section without the field before a lazy converter is
+# pruned, tire pressure is only fetched every 10 minutes
+LAZY_PRUNE_REFRESHES = 10
+KEEP_VALID_RECOVER = 3  # consistent readings that replace an implausible last valid value
+ODOMETER_MAX_DELTA = 1000  # km between two snapshots
+SNAPSHOT_KEYS = ('carInfo', 'carStatus', 'checkStatus', 'tirePressure')
+SNAPSHOT_SAVE_DELAY = 30  # seconds
+STORAGE_VERSION = 1
+TIMING_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)  # ms
+
 SUPPORTED_PLATFORMS = [
     Platform.BUTTON,
     Platform.BINARY_SENSOR,
@@ -48,6 +122,12 @@ SUPPORTED_PLATFORMS = [
 _LOGGER = logging.getLogger(__name__)
 
 
+def json_loads(body):
+    if orjson:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
 def generate_random_letters(length):
     letters = string.ascii_letters
     return ''.join(random.choice(letters) for _ in range(length))
@@ -58,258 +138,550 @@ sgmwappversion = '1691'
 sgmwsystem = 'android'
 sgmwsystemversion = '10'
 
+# same for every account, sent as the client session defaults
+APP_HEADERS = {
+    'Accept': 'application/json',
+    'Content-Type': 'application/json; charset=UTF-8',
+    'User-Agent': 'okhttp/4.9.0',
+    'channel': 'linglingbang',
+    'platformNo': 'Android',
+    'appVersionCode': '1691',
+    'version': 'V8.2.17',
+    'imei': 'a-c62b2f538bf34758',
+    'imsi': 'unknown',
+    'deviceModel': 'MI 8',
+    'deviceBrand': 'Xiaomi',
+    'deviceType': 'Android',
+    'accessChannel': '1',
+    'sgmwnonce': sgmwnonce,
+    'sgmwappcode': sgmwappcode,
+    'sgmwappversion': sgmwappversion,
+    'sgmwsystem': sgmwsystem,
+    'sgmwsystemversion': sgmwsystemversion,
+}
 
-class NonZeroNumberSensorConv(NumberSensorConv):
-    def decode(self, coordinator, payload, value):
-        if value is None or value == "" or value == "0":
-            entity_id = f"sensor.{coordinator.vin_sort}_{self.attr}"
-            state_obj = coordinator.hass.states.get(entity_id)
-            if state_obj and state_obj.state not in ("unknown", "unavailable", "none", "0", ""):
-                try:
-                    restored = float(state_obj.state)
-                    payload[self.attr] = restored
-                    return
-                except (ValueError, TypeError):
-                    pass
-            return
-        try:
-            num_val = float(value)
-            if num_val <= 0:
-                return
-        except (ValueError, TypeError):
-            return
-        final_value = num_val / self.ratio if hasattr(self, 'ratio') and self.ratio else num_val
-        payload[self.attr] = final_value
+
+class ApiError(IntegrationError):
+    """Classified error from the openapi.baojun.net client."""
+
+    def __init__(self, kind: str, message: str, status=None, result=None):
+        super().__init__(message)
+        self.kind = kind  # network, timeout, http, decode, size, auth, breaker
+        self.status = status
+        self.result = result or {}
+
+    @property
+    def retryable(self):
+        if self.kind == 'http':
+            return self.status == 429 or self.status >= 500
+        return self.kind in ('network', 'timeout', 'decode')
+
+
+class Timing:
+    """Histogram of durations in milliseconds."""
+
+    __slots__ = ('count', 'total', 'last', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(TIMING_BUCKETS) + 1)
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        self.max = max(self.max, ms)
+        for i, bound in enumerate(TIMING_BUCKETS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'avg': round(self.total / self.count, 3) if self.count else 0,
+            'last': round(self.last, 3),
+            'max': round(self.max, 3),
+            'buckets': {
+                f'<={b}': n
+                for b, n in zip([*TIMING_BUCKETS, 'inf'], self.buckets)
+            },
+        }
+
+
+# built once at import and shared by every vehicle and config entry
+CONVERTERS = ConverterRegistry([
+    NumberSensorConv('battery', prop='carStatus.batterySoc', keep_valid=True, valid_range=(0, 100)).with_option({
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.BATTERY,
+        'unit_of_measurement': PERCENTAGE,
+    }),
+    NumberSensorConv(
+        'total_mileage', prop='carStatus.mileage',
+        keep_valid=True, nonzero=True, increasing=True, max_delta=ODOMETER_MAX_DELTA,
+    ).with_option({
+        'icon': 'mdi:counter',
+        'state_class': SensorStateClass.TOTAL_INCREASING,
+        'device_class': SensorDeviceClass.DISTANCE,
+        'unit_of_measurement': UnitOfLength.KILOMETERS,
+    }),
+    NumberSensorConv('left_mileage', prop='carStatus.leftMileage').with_option({
+        'icon': 'mdi:lightning-bolt',
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.DISTANCE,
+        'unit_of_measurement': UnitOfLength.KILOMETERS,
+    }),
+    NumberSensorConv('left_mileage_oil', prop='carStatus.oilLeftMileage', enabled=None).with_option({
+        'icon': 'mdi:water',
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.DISTANCE,
+        'unit_of_measurement': UnitOfLength.KILOMETERS,
+    }),
+    NumberSensorConv('avgFuel', prop='carStatus.avgFuel', enabled=None).with_option({
+        'icon': 'mdi:water',
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.DISTANCE,
+        'unit_of_measurement': UnitOfLength.KILOMETERS,
+    }),
+    NumberSensorConv(
+        'total_hev_mileage', prop='carStatus.hybridMileage', enabled=None,
+        keep_valid=True, nonzero=True, increasing=True, max_delta=ODOMETER_MAX_DELTA,
+    ).with_option({
+        'icon': 'mdi:car-electric',
+        'state_class': SensorStateClass.TOTAL_INCREASING,
+        'device_class': SensorDeviceClass.DISTANCE,
+        'unit_of_measurement': UnitOfLength.KILOMETERS,
+    }),
+    NumberSensorConv('oil_level', prop='carStatus.leftFuel', enabled=None).with_option({
+        'icon': 'mdi:water-percent',
+        'state_class': SensorStateClass.MEASUREMENT,
+        'unit_of_measurement': PERCENTAGE,
+    }),
+    NumberSensorConv('battery_temp', prop='carStatus.batAvgTemp', enabled=None).with_option({
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.TEMPERATURE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfTemperature.CELSIUS,
+    }),
+    NumberSensorConv('battery_voltage', prop='carStatus.voltage', enabled=None).with_option({
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.VOLTAGE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfElectricPotential.VOLT,
+    }),
+    NumberSensorConv('battery_health', prop='carStatus.batHealth', enabled=None).with_option({
+        'icon': 'mdi:battery-heart-variant',
+        'state_class': SensorStateClass.MEASUREMENT,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': PERCENTAGE,
+    }),
+    SensorConv('battery_status', prop='carStatus.batteryStatus', enabled=None).with_option({
+        'icon': 'mdi:battery-unknown',
+    }),
+    NumberSensorConv('small_battery_voltage', prop='carStatus.lowBatVol', enabled=None).with_option({
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.VOLTAGE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfElectricPotential.VOLT,
+    }),
+
+    BoolConv('door_lock', Platform.LOCK, prop='carStatus.doorLockStatus', reverse=True).with_option({
+        'icon': 'mdi:car-door-lock',
+    }),
+    BinarySensorConv('door1_locked', prop='carStatus.door1LockStatus', parent='door_lock'),
+    BinarySensorConv('door2_locked', prop='carStatus.door2LockStatus', parent='door_lock'),
+    BinarySensorConv('door3_locked', prop='carStatus.door3LockStatus', parent='door_lock'),
+    BinarySensorConv('door4_locked', prop='carStatus.door4LockStatus', parent='door_lock'),
+
+    BinarySensorConv('door_status', prop='carStatus.doorOpenStatus').with_option({
+        'icon': 'mdi:car-door',
+        'device_class': BinarySensorDeviceClass.DOOR,
+    }),
+    BinarySensorConv('door1_status', prop='carStatus.door1OpenStatus', parent='door_status'),
+    BinarySensorConv('door2_status', prop='carStatus.door2OpenStatus', parent='door_status'),
+    BinarySensorConv('door3_status', prop='carStatus.door3OpenStatus', parent='door_status'),
+    BinarySensorConv('door4_status', prop='carStatus.door4OpenStatus', parent='door_status'),
+    BinarySensorConv('tail_door_status', prop='carStatus.tailDoorOpenStatus', enabled=None).with_option({
+        'icon': 'mdi:car-door-lock',
+        'device_class': BinarySensorDeviceClass.LOCK,
+    }),
+
+    BinarySensorConv('window_status', prop='carStatus.windowOpenStatus').with_option({
+        'icon': 'mdi:dock-window',
+        'device_class': BinarySensorDeviceClass.WINDOW,
+    }),
+    BinarySensorConv('window1_status', prop='carStatus.window1OpenStatus', parent='window_status'),
+    BinarySensorConv('window2_status', prop='carStatus.window2OpenStatus', parent='window_status'),
+    BinarySensorConv('window3_status', prop='carStatus.window3OpenStatus', parent='window_status'),
+    BinarySensorConv('window4_status', prop='carStatus.window4OpenStatus', parent='window_status'),
+
+    BinarySensorConv('charging', prop='carStatus.charging').with_option({
+        'device_class': BinarySensorDeviceClass.BATTERY_CHARGING,
+    }),
+    BinarySensorConv('plugging', prop='carStatus.vecChrgingSts', enabled=None).with_option({
+        'icon': 'mdi:power-plug',
+        'device_class': BinarySensorDeviceClass.PLUG,
+    }),
+    MapSensorConv('key_status', prop='carStatus.keyStatus', map={
+        '0': '无钥匙',
+        '1': '已连接',
+        '2': '已启动',
+    }).with_option({
+        'icon': 'mdi:key',
+    }),
+    MapSensorConv('gear_status', prop='carStatus.autoGearStatus', map={
+        '10': 'P',
+        '12': 'D',
+        '13': 'N',
+        '14': 'R',
+    }).with_option({
+        'icon': 'mdi:car-shift-pattern',
+    }),
+
+    MapConv('ac', domain=Platform.CLIMATE, prop='carStatus.acStatus', map={
+        '0': 'off',
+        '1': 'cool',
+        '2': 'heat',
+    }).with_option({
+        'icon': 'mdi:air-conditioner',
+    }),
+    NumberSensorConv('current_temperature', prop='carStatus.invActTemp', parent='ac'),
+    NumberSensorConv('target_temperature', prop='carStatus.accCntTemp', parent='ac'),
+
+    ButtonConv('search_car', press='async_search_car').with_option({
+        'icon': 'mdi:car-search',
+    }),
+    Converter('location', Platform.DEVICE_TRACKER).with_option({
+        'icon': 'mdi:car',
+    }),
+    NumberSensorConv('latitude', prop='carStatus.latitude', parent='location', precision=6),
+    NumberSensorConv('longitude', prop='carStatus.longitude', parent='location', precision=6),
+    NumberSensorConv('battery_level', prop='carStatus.batterySoc', parent='location'),
+    SensorConv('vin', prop='carInfo.vin', parent='location'),
+    SensorConv('name', prop='carInfo.carName', parent='location'),
+    SensorConv('plate', prop='carInfo.carPlate', parent='location'),
+    SensorConv('color', prop='carInfo.colorName', parent='location'),
+    SensorConv('entity_picture', prop='carInfo.image', parent='location'),
+    SensorConv('collect_time', prop='carStatus.collectTime', parent='location'),
+    ButtonConv('auth_start', press='async_auth_start').with_option({
+        'icon': 'mdi:engine',
+    }),
+    ProblemConv('engine_power', prop='checkStatus.enginePow', reverse=True).with_option({
+        'icon': 'mdi:turbine',
+    }),
+    ProblemConv('engine_temp', prop='checkStatus.engineTemp', reverse=True).with_option({
+        'icon': 'mdi:coolant-temperature',
+    }),
+    ProblemConv('abs', prop='checkStatus.absio').with_option({
+        'icon': 'mdi:car-brake-abs',
+    }),
+    ProblemConv('power_steering', prop='checkStatus.pwrStrIo').with_option({
+        'icon': 'mdi:steering',
+    }),
+    SensorConv('tire_temp', prop='tirePressure.tirTemp', enabled=None).with_option({
+        'icon': 'mdi:tire',
+        'device_class': SensorDeviceClass.TEMPERATURE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfTemperature.CELSIUS,
+    }),
+    NumberSensorConv('tire_pressure_lf', prop='tirePressure.lfTirPrsVal', enabled=None, ratio=100).with_option({
+        'icon': 'mdi:car-tire-alert',
+        'device_class': SensorDeviceClass.PRESSURE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfPressure.KPA,
+    }),
+    NumberSensorConv('tire_pressure_rf', prop='tirePressure.rfTirPrVal', enabled=None, ratio=100).with_option({
+        'icon': 'mdi:car-tire-alert',
+        'device_class': SensorDeviceClass.PRESSURE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfPressure.KPA,
+    }),
+    NumberSensorConv('tire_pressure_lr', prop='tirePressure.lrTirPrVal', enabled=None, ratio=100).with_option({
+        'icon': 'mdi:car-tire-alert',
+        'device_class': SensorDeviceClass.PRESSURE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfPressure.KPA,
+    }),
+    NumberSensorConv('tire_pressure_rr', prop='tirePressure.rrTirPrVal', enabled=None, ratio=100).with_option({
+        'icon': 'mdi:car-tire-alert',
+        'device_class': SensorDeviceClass.PRESSURE,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfPressure.KPA,
+    }),
+    SensorConv('api_status', prop='client.breaker').with_option({
+        'icon': 'mdi:cloud-check-variant',
+        'entity_category': EntityCategory.DIAGNOSTIC,
+    }),
+    SensorConv('api_failures', prop='client.failures', parent='api_status'),
+    NumberSensorConv('poll_duration', prop='client.poll_ms', enabled=False).with_option({
+        'icon': 'mdi:timer-outline',
+        'state_class': SensorStateClass.MEASUREMENT,
+        'device_class': SensorDeviceClass.DURATION,
+        'entity_category': EntityCategory.DIAGNOSTIC,
+        'unit_of_measurement': UnitOfTime.MILLISECONDS,
+    }),
+])
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     hass.data.setdefault(entry.entry_id, {})
     hass.data[entry.entry_id].setdefault('entities', {})
+    if CONF_WEBHOOK_ID not in entry.data:
+        # random and kept across token changes, set before the reload listener exists
+        hass.config_entries.async_update_entry(entry, data={
+            **entry.data, CONF_WEBHOOK_ID: webhook.async_generate_id(),
+        })
+    # request headers are built from the credentials once, reload when they change
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    fleet = FleetScheduler.get(hass)
     coordinator = StateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
-    await coordinator.check_auth()
+    if await coordinator.async_restore_snapshot():
+        # entities come up from the stored snapshot, the cloud catches up later
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f'{DOMAIN}-first-refresh-{coordinator.vin_sort}',
+        )
+    else:
+        # an expired login fails the setup and starts the reauth flow
+        await coordinator.async_config_entry_first_refresh()
     hass.data[entry.entry_id]['coordinator'] = coordinator
+    fleet.coordinators[entry.entry_id] = coordinator
 
-    hass.services.async_register(
-        DOMAIN, 'update_status', coordinator.update_from_service,
-        schema=vol.Schema({}, extra=vol.ALLOW_EXTRA),
-        supports_response=SupportsResponse.OPTIONAL,
+    # a relay can push status changes instead of waiting for the next poll,
+    # the url is shown in the options form
+    webhook.async_register(
+        hass, DOMAIN, f'{TITLE} {coordinator.car_name}', coordinator.webhook_id,
+        coordinator.async_handle_webhook, allowed_methods=['POST'],
     )
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, coordinator.webhook_id))
+    if topic := entry.options.get(CONF_MQTT_TOPIC):
+        bridge = MqttBridge(coordinator, topic, entry.options.get(CONF_MQTT_QOS) or 0)
+        entry.async_create_background_task(hass, bridge.async_start(), f'{DOMAIN}-mqtt-{coordinator.vin_sort}')
+
+    if not hass.services.has_service(DOMAIN, 'update_status'):
+        hass.services.async_register(
+            DOMAIN, 'update_status', fleet.update_from_service,
+            schema=vol.Schema({}, extra=vol.ALLOW_EXTRA),
+            supports_response=SupportsResponse.OPTIONAL,
+        )
 
     await hass.config_entries.async_forward_entry_setups(entry, SUPPORTED_PLATFORMS)
 
     return True
 
 
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    ok = await hass.config_entries.async_unload_platforms(entry, SUPPORTED_PLATFORMS)
+    if ok:
+        hass.data.pop(entry.entry_id, None)
+        fleet = FleetScheduler.get(hass)
+        fleet.coordinators.pop(entry.entry_id, None)
+        if not fleet.coordinators:
+            hass.services.async_remove(DOMAIN, 'update_status')
+            await fleet.async_close()
+    return ok
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    await Store(hass, STORAGE_VERSION, f'{DOMAIN}.{entry.entry_id}').async_remove()
+
+
+class FleetScheduler:
+    """Vehicles of all config entries, refreshed through one request budget."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.coordinators = {}
+        self.semaphore = asyncio.Semaphore(FLEET_CONCURRENCY)
+        self._session = None
+        self._unsub_close = None
+
+    @classmethod
+    def get(cls, hass: HomeAssistant) -> "FleetScheduler":
+        data = hass.data.setdefault(DOMAIN, {})
+        if 'fleet' not in data:
+            data['fleet'] = cls(hass)
+        return data['fleet']
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Keep-alive session to the cloud, shared by all vehicles."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=get_default_context(),
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=APP_HEADERS,
+                timeout=REQUEST_TIMEOUT,
+            )
+            self._unsub_close = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self.async_close)
+        return self._session
+
+    async def async_close(self, event=None):
+        if self._unsub_close and event is None:
+            # closed before shutdown, the listener is still registered
+            self._unsub_close()
+        self._unsub_close = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def find(self, vin=None):
+        return [
+            c for c in self.coordinators.values()
+            if not vin or vin in (c.vin, c.vin_sort)
+        ]
+
+    async def update_from_service(self, call: ServiceCall):
+        coordinators = self.find(call.data.get('vin'))
+        await asyncio.gather(*[c.async_request_refresh() for c in coordinators])
+        if len(self.coordinators) == 1:
+            return coordinators[0].data if coordinators else {}
+        return {c.vin: c.data for c in coordinators}
+
+
+class MqttBridge:
+    """Publishes decoded deltas of a car to MQTT and feeds pushes from it back in."""
+
+    def __init__(self, coordinator: "StateCoordinator", topic: str, qos=0):
+        self.coordinator = coordinator
+        self.hass = coordinator.hass
+        self.topic = f'{topic.rstrip("/")}/{coordinator.vin_sort}'
+        self.qos = int(qos)
+        self.pending = {}
+        self._unsub_flush = None
+
+    async def async_start(self):
+        # mqtt is only an after dependency, the bridge is optional
+        from homeassistant.components import mqtt
+        if not await mqtt.async_wait_for_mqtt_client(self.hass):
+            _LOGGER.warning('MQTT is not available, bridge of %s disabled', self.coordinator.vin_sort)
+            return False
+        entry = self.coordinator.entry
+        entry.async_on_unload(await mqtt.async_subscribe(
+            self.hass, f'{self.topic}/push', self.async_handle_message, self.qos, encoding=None,
+        ))
+        entry.async_on_unload(self.async_stop)
+        self.coordinator.mqtt = self
+        return True
+
+    @callback
+    def async_stop(self):
+        self.coordinator.mqtt = None
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def async_handle_message(self, msg):
+        try:
+            body = json_loads(msg.payload)
+        except ValueError:
+            _LOGGER.warning('Invalid push on %s', msg.topic)
+            return
+        if sections := self.coordinator.push_sections(body):
+            self.coordinator.ingest_push(sections)
+
+    @callback
+    def publish(self, delta: dict):
+        """Queue changed values, deltas within the batch delay go out as one message."""
+        self.pending.update(delta)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, MQTT_BATCH_DELAY, self._async_flush)
+
+    async def _async_flush(self, *_):
+        from homeassistant.components import mqtt
+        self._unsub_flush = None
+        payload, self.pending = self.pending, {}
+        if not payload:
+            return
+        await mqtt.async_publish(
+            self.hass, f'{self.topic}/state',
+            json.dumps(payload, separators=(',', ':'), default=str), self.qos,
+        )
+        self.coordinator.stats['mqtt_published'] += 1
+
+
 class StateCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
         super().__init__(
             hass,
             _LOGGER,
             name=f"{entry.entry_id}-coordinator",
-            update_interval=timedelta(seconds=60),
+            update_interval=POLL_INTERVAL,
         )
         self.entry = entry
         self.data = {}
         self.extra = {}
         self.entities = {}
-        self._last_nonzero_values = {}
-
-        from homeassistant.components.sensor import SensorStateClass, SensorDeviceClass
-        from homeassistant.components.binary_sensor import BinarySensorDeviceClass
-        self.converters = [
-            NumberSensorConv('battery', prop='carStatus.batterySoc').with_option({
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.BATTERY,
-                'unit_of_measurement': PERCENTAGE,
-            }),
-            NumberSensorConv('total_mileage', prop='carStatus.mileage').with_option({
-                'icon': 'mdi:counter',
-                'state_class': SensorStateClass.TOTAL_INCREASING,
-                'device_class': SensorDeviceClass.DISTANCE,
-                'unit_of_measurement': UnitOfLength.KILOMETERS,
-            }),
-            NumberSensorConv('left_mileage', prop='carStatus.leftMileage').with_option({
-                'icon': 'mdi:lightning-bolt',
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.DISTANCE,
-                'unit_of_measurement': UnitOfLength.KILOMETERS,
-            }),
-            NumberSensorConv('left_mileage_oil', prop='carStatus.oilLeftMileage').with_option({
-                'icon': 'mdi:water',
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.DISTANCE,
-                'unit_of_measurement': UnitOfLength.KILOMETERS,
-            }),
-            NumberSensorConv('avgFuel', prop='carStatus.avgFuel').with_option({
-                'icon': 'mdi:water',
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.DISTANCE,
-                'unit_of_measurement': UnitOfLength.KILOMETERS,
-            }),
-            NonZeroNumberSensorConv('total_hev_mileage', prop='carStatus.hybridMileage').with_option({
-                'icon': 'mdi:car-electric',
-                'state_class': SensorStateClass.TOTAL_INCREASING,
-                'device_class': SensorDeviceClass.DISTANCE,
-                'unit_of_measurement': UnitOfLength.KILOMETERS,
-            }),
-            NumberSensorConv('oil_level', prop='carStatus.leftFuel').with_option({
-                'icon': 'mdi:water-percent',
-                'state_class': SensorStateClass.MEASUREMENT,
-                'unit_of_measurement': PERCENTAGE,
-            }),
-            NumberSensorConv('battery_temp', prop='carStatus.batAvgTemp').with_option({
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.TEMPERATURE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfTemperature.CELSIUS,
-            }),
-            NumberSensorConv('battery_voltage', prop='carStatus.voltage').with_option({
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.VOLTAGE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfElectricPotential.VOLT,
-            }),
-            NumberSensorConv('battery_health', prop='carStatus.batHealth').with_option({
-                'icon': 'mdi:battery-heart-variant',
-                'state_class': SensorStateClass.MEASUREMENT,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': PERCENTAGE,
-            }),
-            SensorConv('battery_status', prop='carStatus.batteryStatus').with_option({
-                'icon': 'mdi:battery-unknown',
-            }),
-            NumberSensorConv('small_battery_voltage', prop='carStatus.lowBatVol').with_option({
-                'state_class': SensorStateClass.MEASUREMENT,
-                'device_class': SensorDeviceClass.VOLTAGE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfElectricPotential.VOLT,
-            }),
-
-            BoolConv('door_lock', Platform.LOCK, prop='carStatus.doorLockStatus', reverse=True).with_option({
-                'icon': 'mdi:car-door-lock',
-            }),
-            BinarySensorConv('door1_locked', prop='carStatus.door1LockStatus', parent='door_lock'),
-            BinarySensorConv('door2_locked', prop='carStatus.door2LockStatus', parent='door_lock'),
-            BinarySensorConv('door3_locked', prop='carStatus.door3LockStatus', parent='door_lock'),
-            BinarySensorConv('door4_locked', prop='carStatus.door4LockStatus', parent='door_lock'),
-
-            BinarySensorConv('door_status', prop='carStatus.doorOpenStatus').with_option({
-                'icon': 'mdi:car-door',
-                'device_class': BinarySensorDeviceClass.DOOR,
-            }),
-            BinarySensorConv('door1_status', prop='carStatus.door1OpenStatus', parent='door_status'),
-            BinarySensorConv('door2_status', prop='carStatus.door2OpenStatus', parent='door_status'),
-            BinarySensorConv('door3_status', prop='carStatus.door3OpenStatus', parent='door_status'),
-            BinarySensorConv('door4_status', prop='carStatus.door4OpenStatus', parent='door_status'),
-            BinarySensorConv('tail_door_status', prop='carStatus.tailDoorOpenStatus').with_option({
-                'icon': 'mdi:car-door-lock',
-                'device_class': BinarySensorDeviceClass.LOCK,
-            }),
-
-            BinarySensorConv('window_status', prop='carStatus.windowOpenStatus').with_option({
-                'icon': 'mdi:dock-window',
-                'device_class': BinarySensorDeviceClass.WINDOW,
-            }),
-            BinarySensorConv('window1_status', prop='carStatus.window1OpenStatus', parent='window_status'),
-            BinarySensorConv('window2_status', prop='carStatus.window2OpenStatus', parent='window_status'),
-            BinarySensorConv('window3_status', prop='carStatus.window3OpenStatus', parent='window_status'),
-            BinarySensorConv('window4_status', prop='carStatus.window4OpenStatus', parent='window_status'),
-
-            BinarySensorConv('charging', prop='carStatus.charging').with_option({
-                'device_class': BinarySensorDeviceClass.BATTERY_CHARGING,
-            }),
-            BinarySensorConv('plugging', prop='carStatus.vecChrgingSts').with_option({
-                'icon': 'mdi:power-plug',
-                'device_class': BinarySensorDeviceClass.PLUG,
-            }),
-            MapSensorConv('key_status', prop='carStatus.keyStatus', map={
-                '0': '无钥匙',
-                '1': '已连接',
-                '2': '已启动',
-            }).with_option({
-                'icon': 'mdi:key',
-            }),
-            MapSensorConv('gear_status', prop='carStatus.autoGearStatus', map={
-                '10': 'P',
-                '12': 'D',
-                '13': 'N',
-                '14': 'R',
-            }).with_option({
-                'icon': 'mdi:car-shift-pattern',
-            }),
-
-            MapConv('ac', domain=Platform.CLIMATE, prop='carStatus.acStatus', map={
-                '0': 'off',
-                '1': 'cool',
-                '2': 'heat',
-            }).with_option({
-                'icon': 'mdi:air-conditioner',
-            }),
-            NumberSensorConv('current_temperature', prop='carStatus.invActTemp', parent='ac'),
-            NumberSensorConv('target_temperature', prop='carStatus.accCntTemp', parent='ac'),
-
-            ButtonConv('search_car', press='async_search_car').with_option({
-                'icon': 'mdi:car-search',
-            }),
-            Converter('location', Platform.DEVICE_TRACKER).with_option({
-                'icon': 'mdi:car',
-            }),
-            NumberSensorConv('latitude', prop='carStatus.latitude', parent='location', precision=6),
-            NumberSensorConv('longitude', prop='carStatus.longitude', parent='location', precision=6),
-            NumberSensorConv('battery_level', prop='carStatus.batterySoc', parent='location'),
-            SensorConv('vin', prop='carInfo.vin', parent='location'),
-            SensorConv('name', prop='carInfo.carName', parent='location'),
-            SensorConv('plate', prop='carInfo.carPlate', parent='location'),
-            SensorConv('color', prop='carInfo.colorName', parent='location'),
-            SensorConv('entity_picture', prop='carInfo.image', parent='location'),
-            SensorConv('collect_time', prop='carStatus.collectTime', parent='location'),
-            ButtonConv('auth_start', press='async_auth_start').with_option({
-                'icon': 'mdi:engine',
-            }),
-            ProblemConv('engine_power', prop='checkStatus.enginePow', reverse=True).with_option({
-                'icon': 'mdi:turbine',
-            }),
-            ProblemConv('engine_temp', prop='checkStatus.engineTemp', reverse=True).with_option({
-                'icon': 'mdi:coolant-temperature',
-            }),
-            ProblemConv('abs', prop='checkStatus.absio').with_option({
-                'icon': 'mdi:car-brake-abs',
-            }),
-            ProblemConv('power_steering', prop='checkStatus.pwrStrIo').with_option({
-                'icon': 'mdi:steering',
-            }),
-            SensorConv('tire_temp', prop='tirePressure.tirTemp').with_option({
-                'icon': 'mdi:tire',
-                'device_class': SensorDeviceClass.TEMPERATURE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfTemperature.CELSIUS,
-            }),
-            NumberSensorConv('tire_pressure_lf', prop='tirePressure.lfTirPrsVal', ratio=100).with_option({
-                'icon': 'mdi:car-tire-alert',
-                'device_class': SensorDeviceClass.PRESSURE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfPressure.KPA,
-            }),
-            NumberSensorConv('tire_pressure_rf', prop='tirePressure.rfTirPrVal', ratio=100).with_option({
-                'icon': 'mdi:car-tire-alert',
-                'device_class': SensorDeviceClass.PRESSURE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfPressure.KPA,
-            }),
-            NumberSensorConv('tire_pressure_lr', prop='tirePressure.lrTirPrVal', ratio=100).with_option({
-                'icon': 'mdi:car-tire-alert',
-                'device_class': SensorDeviceClass.PRESSURE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfPressure.KPA,
-            }),
-            NumberSensorConv('tire_pressure_rr', prop='tirePressure.rrTirPrVal', ratio=100).with_option({
-                'icon': 'mdi:car-tire-alert',
-                'device_class': SensorDeviceClass.PRESSURE,
-                'entity_category': EntityCategory.DIAGNOSTIC,
-                'unit_of_measurement': UnitOfPressure.KPA,
-            }),
-        ]
+        self.added_entities = 0  # entities written to hass, disabled ones never are
+        self.payload = {}
+        self.stats = Counter()
+        self.timings = {}
+        self._force_push = True
+        self._boost_until = 0
+        self._last_push = None
+        self.mqtt = None
+        self._optimistic = {}  # attr: commanded value awaiting confirmation
+        self._optimistic_until = {}  # attr: monotonic deadline of its confirmation
+        self._confirm_task = None
+        self._commands = {}  # api: queued command in send order, newer calls merge into it
+        self._command_task = None
+        self._last_command = 0
+        self._snapshot_stale = False
+        self._stale_streak = 0
+        self._last_collect_time = None
+        self._last_digest = None
+        self._sub_updated = {}
+        self._sub_semaphore = asyncio.Semaphore(SUB_RESOURCE_CONCURRENCY)
+        self.store = Store(hass, STORAGE_VERSION, f'{DOMAIN}.{entry.entry_id}')
+        # a local stand-in of the cloud can be set for offline replays
+        self.api_base = (entry.options.get(CONF_API_BASE) or API_BASE).rstrip('/')
+        self.headers = {
+            'sgmwaccesstoken': self.access_token,
+            'sgmwclientid': self.client_id,
+            'sgmwclientsecret': self.client_secret,
+        }
+        self._sign_tail = ''.join([
+            self.client_id,
+            self.client_secret,
+            sgmwappcode,
+            sgmwappversion,
+            sgmwsystem,
+            sgmwsystemversion,
+        ])
+        self.cache_ttl = {**READ_CACHE_TTL, **entry.options.get('cache_ttl', {})}
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._failures = 0
+        self._breaker_opened = 0
+        self.last_valid = {}  # attr: last value that passed the converter rules
+        self._implausible = {}  # attr: (last rejected value, consistent rejections)
+
+        self.registry = CONVERTERS
+        # lazy converters join once the car reports their field
+        self.converters = tuple(c for c in CONVERTERS if c.enabled is not None)
+        self._active = {c.attr for c in self.converters}
+        self._lazy = {c.attr: c for c in CONVERTERS if c.enabled is None}
+        self._lazy_misses = Counter()
+        self._refreshed_sections = set()  # data keys fetched or pushed since the last dispatch
+        self._platforms = {}
+        # converter attr -> entities subscribed to it
+        self.listeners = {}
+        self.poll_converters = CONVERTERS.pick(POLL_STATE_ATTRS)
+        self.client_converters = CONVERTERS.pick(CLIENT_STATE_ATTRS)
 
     @property
     def access_token(self):
@@ -352,46 +724,406 @@ class StateCoordinator(DataUpdateCoordinator):
         model = self.car_info.get('model', '')
         return f'{name} {model}'.strip()
 
-    async def update_from_service(self, call: ServiceCall):
-        data = call.data
-        await self.async_request_refresh()
-        return self.data
+    @property
+    def fleet(self):
+        return FleetScheduler.get(self.hass)
+
+    async def async_restore_snapshot(self):
+        """Load the last stored snapshot, return False if there is none."""
+        stored = await self.store.async_load()
+        if not stored or not stored.get('carInfo'):
+            return False
+        self.last_valid.update(stored.pop('lastValid', None) or {})
+        self.data.update(stored)
+        # a stored snapshot only activates converters, it never counts as a miss
+        self.discover_converters(())
+        self.payload = self.decode({**self.data, 'client': self.client_status})
+        return True
+
+    def snapshot(self):
+        return {
+            **{k: self.data[k] for k in SNAPSHOT_KEYS if k in self.data},
+            'lastValid': self.last_valid,
+        }
+
+    @property
+    def webhook_id(self):
+        return self.entry.data.get(CONF_WEBHOOK_ID)
+
+    async def async_handle_webhook(self, hass: HomeAssistant, webhook_id: str, request: web.Request):
+        try:
+            body = json_loads(await self.read_body('webhook', request))
+        except ApiError:
+            return web.Response(status=413)
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(body, dict):
+            return web.Response(status=400)
+        sections = self.push_sections(body, require_vin=True)
+        if sections is None:
+            return web.Response(status=403)
+        if not sections:
+            return web.Response(status=400)
+        self.ingest_push(sections)
+        return web.Response(status=200)
+
+    def push_sections(self, body, require_vin=False):
+        """Status sections of a pushed body, None when it is for another car."""
+        if not isinstance(body, dict):
+            return {}
+        # either the cloud response shape or the bare sections
+        data = body.get('data') if isinstance(body.get('data'), dict) else body
+        vin = data.get('vin') or (data.get('carInfo') or {}).get('vin')
+        if (vin or require_vin) and f'{vin}'.upper() != f'{self.vin}'.upper():
+            _LOGGER.warning('Push for unknown vin rejected: %s', vin)
+            return None
+        return {
+            k: data[k]
+            for k in PUSH_SECTIONS
+            if isinstance(data.get(k), dict)
+        }
 
-    async def check_auth(self):
-        code = self.extra.get('errorCode')
-        if code == '500009':
-            msg = self.extra.get('errorMessage') or '登陆失效'
-            raise IntegrationError(msg)
+    @callback
+    def ingest_push(self, sections: dict):
+        """Merge pushed sections and dispatch them like a poll result."""
+        self.stats['pushes'] += 1
+        self._last_push = time.monotonic()
+        applied = [key for key, value in sections.items() if self.merge_section(key, value)]
+        if not applied:
+            return
+        self._refreshed_sections.update(applied)
+        # a cached read would roll the pushed state back
+        self.invalidate_cache(*CONTROL_INVALIDATES)
+        self._snapshot_stale = self.check_stale(refreshed=True)
+        if not self._snapshot_stale:
+            self.store.async_delay_save(self.snapshot, SNAPSHOT_SAVE_DELAY)
+        self.update_interval = self.next_update_interval()
+        self.async_set_updated_data(self.data)
+
+    @property
+    def breaker_state(self):
+        if self._failures < BREAKER_THRESHOLD:
+            return 'closed'
+        if time.monotonic() - self._breaker_opened < BREAKER_COOLDOWN.total_seconds():
+            return 'open'
+        return 'half_open'
+
+    @property
+    def client_status(self):
+        poll = self.timings.get('poll')
+        return {
+            'breaker': self.breaker_state,
+            'failures': self._failures,
+            'poll_ms': poll.last if poll else None,
+        }
+
+    def record_timing(self, name: str, started: float):
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.add((time.perf_counter() - started) * 1000)
+
+    def record_failure(self, exc: ApiError):
+        if exc.retryable:
+            self._failures += 1
+            if self._failures >= BREAKER_THRESHOLD:
+                # (re)open the breaker, also when a half-open probe failed
+                self._breaker_opened = time.monotonic()
+        return exc
+
+    def record_success(self):
+        self._failures = 0
 
     async def _async_update_data(self):
-        result = await self.async_request('userCarRelation/queryDefaultCarStatus')
-        data = result.pop('data', None) or {}
-        self.data.update(data)
-        self.extra = result
+        started = time.perf_counter()
+        try:
+            return await self._async_update_vehicle()
+        finally:
+            self.record_timing('poll', started)
+
+    async def _async_update_vehicle(self):
+        try:
+            if self.vin:
+                # sub-resources only need the vin, fetch them alongside the status
+                _, refreshed = await asyncio.gather(
+                    self.async_update_status(),
+                    self.async_update_sub_resources(),
+                )
+            else:
+                await self.async_update_status()
+                refreshed = await self.async_update_sub_resources()
+        except ApiError as exc:
+            if exc.kind == 'auth':
+                # entities go unavailable and the entry asks for a new login
+                raise ConfigEntryAuthFailed(str(exc)) from exc
+            if self.breaker_state == 'open':
+                # upstream is down, wait for the breaker instead of polling
+                self.update_interval = BREAKER_COOLDOWN
+            # listeners are not notified of repeated failures
+            self.push_client_state()
+            raise UpdateFailed(str(exc)) from exc
 
-        minute = now().minute
-        if minute % 10 == 0 or 'checkStatus' not in self.data:
-            await self.async_update_check()
-            await self.async_update_tire()
+        self._snapshot_stale = self.check_stale(refreshed)
+        if self._snapshot_stale:
+            self._stale_streak += 1
+            self.stats['snapshots_stale'] += 1
+        else:
+            self._stale_streak = 0
+            self.stats['snapshots_fresh'] += 1
+            self.store.async_delay_save(self.snapshot, SNAPSHOT_SAVE_DELAY)
 
+        # the coordinator schedules the next poll right after this returns
+        self.update_interval = self.next_update_interval()
         return self.data
 
+    async def async_update_status(self):
+        result = await self.async_request('userCarRelation/queryDefaultCarStatus')
+        data = result.get('data') or {}
+        for key, value in data.items():
+            if not isinstance(value, dict):
+                self.data[key] = value
+            elif not self.merge_section(key, value, replace=True):
+                continue
+            self._refreshed_sections.add(key)
+        self.extra = {k: v for k, v in result.items() if k != 'data'}
+        return data
+
+    async def async_update_sub_resources(self):
+        current = time.monotonic()
+        due = [
+            key
+            for key, (_, interval) in SUB_RESOURCES.items()
+            # restored sections count as due until fetched once in this run
+            if key not in self._sub_updated
+            or current - self._sub_updated[key] >= interval.total_seconds()
+        ]
+        if not due:
+            return False
+        results = await asyncio.gather(
+            *[self._async_update_sub_resource(key) for key in due],
+            return_exceptions=True,
+        )
+        refreshed = False
+        for key, res in zip(due, results):
+            if isinstance(res, Exception):
+                _LOGGER.warning('Update %s failed: %s', key, res)
+                continue
+            self._sub_updated[key] = time.monotonic()
+            refreshed = True
+        return refreshed
+
+    async def _async_update_sub_resource(self, key):
+        method, _ = SUB_RESOURCES[key]
+        async with self._sub_semaphore:
+            return await getattr(self, method)()
+
+    def merge_section(self, key: str, value: dict, replace=False):
+        """Apply a polled or pushed section, unless it is older than the one applied."""
+        current = self.data.get(key) or {}
+        collected = self.collect_timestamp(value.get('collectTime'))
+        applied = self.collect_timestamp(current.get('collectTime'))
+        if collected is not None and applied is not None and collected < applied:
+            # a poll answered from an older cloud snapshot than the last push
+            self.stats['sections_outdated'] += 1
+            return False
+        self.data[key] = value if replace else {**current, **value}
+        return True
+
+    def check_stale(self, refreshed=False):
+        """Whether the cloud returned the same snapshot as the previous poll."""
+        collect_time = self.car_status.get('collectTime')
+        last_time, self._last_collect_time = self._last_collect_time, collect_time
+        if collect_time and collect_time != last_time:
+            self._last_digest = None
+            return False
+        if collect_time and not refreshed:
+            return True
+        digest = hash(json.dumps(self.data, sort_keys=True, default=str))
+        last_digest, self._last_digest = self._last_digest, digest
+        return digest == last_digest
+
+    def next_update_interval(self):
+        if time.monotonic() < self._boost_until:
+            return POLL_INTERVAL_ACTIVE
+        if self._last_push and time.monotonic() - self._last_push < PUSH_TIMEOUT.total_seconds():
+            # the relay reports changes, polling is only a safety net
+            return POLL_INTERVAL_PUSH
+        if self._stale_streak >= STALE_BACKOFF:
+            return POLL_INTERVAL_PARKED
+        state = self.decode(self.data, self.poll_converters)
+        age = self.snapshot_age(state.get('collect_time'))
+        if age is not None and age > POLL_INTERVAL_PARKED.total_seconds() * 6:
+            # the car is asleep and the cloud has nothing newer to offer
+            return POLL_INTERVAL_PARKED
+        if state.get('charging') or state.get('ac') not in (None, 'off'):
+            return POLL_INTERVAL_ACTIVE
+        if state.get('key_status') == '已启动' or state.get('gear_status') in ('D', 'N', 'R'):
+            return POLL_INTERVAL_ACTIVE
+        if state.get('door_lock') and state.get('key_status') in (None, '无钥匙'):
+            return POLL_INTERVAL_PARKED
+        return POLL_INTERVAL
+
+    @classmethod
+    def snapshot_age(cls, collect_time):
+        ts = cls.collect_timestamp(collect_time)
+        if ts is None:
+            return None
+        return time.time() - ts
+
+    @staticmethod
+    def collect_timestamp(collect_time):
+        """Epoch seconds of a collectTime in ms, seconds or a datetime string."""
+        if not collect_time:
+            return None
+        try:
+            ts = float(collect_time)
+            return ts / 1000 if ts > 1e11 else ts
+        except (TypeError, ValueError):
+            pass
+        dt = parse_datetime(f'{collect_time}')
+        if dt is None:
+            return None
+        return as_utc(dt).timestamp()
+
+    def boost_polling(self):
+        self._boost_until = time.monotonic() + COMMAND_BOOST.total_seconds()
+        self.update_interval = POLL_INTERVAL_ACTIVE
+        self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_control(self, api: str, optimistic=None, **kwargs):
+        """Queue a command for the car and wait for the result of the request that carried it."""
+        if cmd := self._commands.get(api):
+            self.stats['commands_merged'] += 1
+            self.merge_command(cmd, optimistic, kwargs)
+        else:
+            cmd = self._commands[api] = {
+                'kwargs': kwargs,
+                'optimistic': dict(optimistic or {}),
+                'future': self.hass.loop.create_future(),
+            }
+        if self._command_task is None or self._command_task.done():
+            # callers only wait for their future, cancelling one never drops a queued command
+            self._command_task = self.entry.async_create_background_task(
+                self.hass, self._async_send_commands(), f'{DOMAIN}-commands-{self.vin_sort}',
+            )
+        return await asyncio.shield(cmd['future'])
+
+    @staticmethod
+    def merge_command(cmd: dict, optimistic, kwargs: dict):
+        """Fold a newer call into a queued command, the last value of every field wins."""
+        queued = cmd['kwargs']
+        for key, value in kwargs.items():
+            if isinstance(value, dict) and isinstance(queued.get(key), dict):
+                queued[key] = {**queued[key], **value}
+            else:
+                queued[key] = value
+        cmd['optimistic'].update(optimistic or {})
+
+    async def _async_send_commands(self):
+        try:
+            while self._commands:
+                wait = self._last_command + COMMAND_SPACING.total_seconds() - time.monotonic()
+                if wait > 0:
+                    # calls arriving meanwhile still merge into the queued command
+                    await asyncio.sleep(wait)
+                api = next(iter(self._commands))
+                cmd = self._commands.pop(api)
+                try:
+                    result = await self._async_send_command(api, cmd['optimistic'], **cmd['kwargs'])
+                except asyncio.CancelledError:
+                    cmd['future'].cancel()
+                    raise
+                except Exception as exc:
+                    cmd['future'].set_exception(exc)
+                else:
+                    cmd['future'].set_result(result)
+                finally:
+                    self._last_command = time.monotonic()
+        finally:
+            # unloaded while commands were waiting
+            for cmd in self._commands.values():
+                cmd['future'].cancel()
+            self._commands.clear()
+
+    async def _async_send_command(self, api: str, optimistic=None, **kwargs):
+        self.stats['commands_sent'] += 1
+        try:
+            result = await self.async_request(api, **kwargs)
+        except ApiError as exc:
+            # the waiting service calls fail with it, nothing was sent to the car
+            _LOGGER.error('Control %s failed: %s', api, exc)
+            raise
+        self.invalidate_cache(*CONTROL_INVALIDATES)
+        if optimistic and result.get('result'):
+            self.apply_optimistic(optimistic)
+        self.boost_polling()
+        return result
+
+    @callback
+    def apply_optimistic(self, values: dict):
+        """Show the commanded state now and poll until the cloud confirms it."""
+        # every command gets its own confirmation window, also when others are pending
+        deadline = time.monotonic() + CONFIRM_TIMEOUT.total_seconds()
+        self._optimistic.update(values)
+        self._optimistic_until.update(dict.fromkeys(values, deadline))
+        self.payload.update(values)
+        self.push_state(values)
+        if self._confirm_task is None or self._confirm_task.done():
+            self._confirm_task = self.entry.async_create_background_task(
+                self.hass, self._async_confirm_commands(), f'{DOMAIN}-confirm-{self.vin_sort}',
+            )
+
+    def confirm_optimistic(self, payload: dict):
+        for attr, value in list(self._optimistic.items()):
+            if payload.get(attr) == value:
+                self._optimistic.pop(attr)
+                self._optimistic_until.pop(attr, None)
+            else:
+                # keep showing the commanded state until confirmed or expired
+                payload[attr] = value
+
+    async def _async_confirm_commands(self):
+        while self._optimistic:
+            await asyncio.sleep(CONFIRM_INTERVAL.total_seconds())
+            self.invalidate_cache(*CONTROL_INVALIDATES)
+            await self.async_refresh()
+            self.expire_optimistic()
+
+    @callback
+    def expire_optimistic(self):
+        """Roll back the commanded values whose confirmation window has passed."""
+        current = time.monotonic()
+        expired = {
+            attr: value
+            for attr, value in self._optimistic.items()
+            if self._optimistic_until.get(attr, 0) <= current
+        }
+        if not expired:
+            return
+        _LOGGER.warning('Commands not confirmed for %s, rolling back: %s', self.vin_sort, expired)
+        for attr in expired:
+            self._optimistic.pop(attr)
+            self._optimistic_until.pop(attr, None)
+        actual = self.decode(self.data, self.registry.pick(expired))
+        self.payload.update(actual)
+        self.push_state(actual)
+
     async def async_auth_start(self):
-        result = await self.async_request('car/control/ignition/authorize', data={
+        result = await self.async_control('car/control/ignition/authorize', data={
             'vin': self.vin,
         })
         data = result.get('data') or {}
         return data
 
     async def async_search_car(self):
-        result = await self.async_request('car/control/searchCar', data={
+        result = await self.async_control('car/control/searchCar', data={
             'vin': self.vin,
         })
         data = result.get('data') or {}
         return data
 
     async def async_control_window(self, status=0):
-        result = await self.async_request('car/control/window', data={
+        result = await self.async_control('car/control/window', data={
             'vin': self.vin,
             'status': status,
         })
@@ -402,108 +1134,296 @@ class StateCoordinator(DataUpdateCoordinator):
         result = await self.async_request('car/check/all', data={
             'vin': self.vin,
         })
-        data = result.pop('data', None) or {}
-        self.data['checkStatus'] = data
+        data = result.get('data') or {}
+        if self.merge_section('checkStatus', data, replace=True):
+            self._refreshed_sections.add('checkStatus')
         return data
 
     async def async_update_tire(self):
         result = await self.async_request('car/info/tire/pressure', json={
             'vin': self.vin,
         })
-        data = result.pop('data', None) or {}
-        self.data['tirePressure'] = data
+        data = result.get('data') or {}
+        if self.merge_section('tirePressure', data, replace=True):
+            self._refreshed_sections.add('tirePressure')
         return data
 
     async def async_request(self, api: str, **kwargs):
+        if api not in IDEMPOTENT_READS:
+            return await self._async_request(api, **kwargs)
+        ttl = self.cache_ttl.get(api)
+        key = self.cache_key(api, kwargs)
+        cached = self._cache.get(key) if ttl else None
+        if cached and cached[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return cached[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._async_fetch(key, ttl, api, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            # same read already on the wire, wait for its response
+            self.stats['requests_coalesced'] += 1
+        return await asyncio.shield(task)
+
+    async def _async_fetch(self, key, ttl, api: str, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                result = await self._async_request(api, **kwargs)
+                break
+            except ApiError as exc:
+                attempt += 1
+                if not exc.retryable or attempt >= RETRY_ATTEMPTS or self.breaker_state == 'open':
+                    raise
+                delay = RETRY_BACKOFF * 2 ** (attempt - 1) + random.uniform(0, RETRY_BACKOFF)
+                _LOGGER.info('Retry %s in %.1fs after %s', api, delay, exc)
+                self.stats['requests_retried'] += 1
+                await asyncio.sleep(delay)
+        if ttl and result and not result.get('errorCode'):
+            # cached results are shared between callers, never mutate them
+            self._cache[key] = (time.monotonic() + ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > READ_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def cache_key(api: str, kwargs: dict):
+        body = {k: kwargs[k] for k in ('params', 'data', 'json') if k in kwargs}
+        return api, json.dumps(body, sort_keys=True, default=str)
+
+    def invalidate_cache(self, *apis):
+        for key in [k for k in self._cache if not apis or k[0] in apis]:
+            self._cache.pop(key, None)
+
+    async def _async_request(self, api: str, **kwargs):
+        if self.breaker_state == 'open':
+            raise ApiError('breaker', f'Request {api} skipped, circuit breaker is open')
+        self.stats['requests_issued'] += 1
+        started = time.perf_counter()
         timestamp = int(time.time() * 1000)
-        kwargs.setdefault('url', f'{API_BASE}/{api.lstrip("/")}')
+        kwargs.setdefault('url', f'{self.api_base}/{api.lstrip("/")}')
         kwargs.setdefault('method', 'POST')
         kwargs['headers'] = {
-            'Accept': 'application/json',
-            'Content-Type': 'application/json; charset=UTF-8',
-            'User-Agent': 'okhttp/4.9.0',
-            'channel': 'linglingbang',
-            'platformNo': 'Android',
-            'appVersionCode': '1691',
-            'version': 'V8.2.17',
-            'imei': 'a-c62b2f538bf34758',
-            'imsi': 'unknown',
-            'deviceModel': 'MI 8',
-            'deviceBrand': 'Xiaomi',
-            'deviceType': 'Android',
-            'accessChannel': '1',
-            'sgmwaccesstoken': self.access_token,
+            **self.headers,
             'sgmwtimestamp': str(timestamp),
-            'sgmwnonce': sgmwnonce,
-            'sgmwclientid': self.client_id,
-            'sgmwclientsecret': self.client_secret,
-            'sgmwappcode': sgmwappcode,
-            'sgmwappversion': sgmwappversion,
-            'sgmwsystem': sgmwsystem,
-            'sgmwsystemversion': sgmwsystemversion,
             'sgmwsignature': self.get_sign(timestamp, sgmwnonce),
             **kwargs.get('headers', {}),
         }
+        self.record_timing('sign', started)
+        started = time.perf_counter()
         try:
-            res = await async_get_clientsession(self.hass).request(
-                **kwargs,
-                timeout=aiohttp.ClientTimeout(total=30),
-            )
-        except Exception as err:
-            _LOGGER.error('Request %s error: %s', api, err)
-            return {}
-        text = await res.text() or ''
+            # a slot per attempt, retry backoffs of one car never hold up the others
+            async with self.fleet.semaphore, self.fleet.session.request(**kwargs) as res:
+                status = res.status
+                body = await self.read_body(api, res)
+        except asyncio.TimeoutError as exc:
+            raise self.record_failure(ApiError('timeout', f'Request {api} timed out')) from exc
+        except aiohttp.ClientError as exc:
+            raise self.record_failure(ApiError('network', f'Request {api} error: {exc}')) from exc
+        finally:
+            self.record_timing(f'request:{api}', started)
+        if status >= 400:
+            raise self.record_failure(ApiError('http', f'Request {api} failed: HTTP {status}', status=status))
+        started = time.perf_counter()
         try:
-            result = json.loads(text) or {}
+            result = json_loads(body) or {}
         except (TypeError, ValueError) as exc:
-            _LOGGER.error('Response from %s error: %s', api, [exc, text])
-            return {}
-        _LOGGER.debug('Request %s result: %s', api, [result, kwargs])
+            _LOGGER.error('Response from %s error: %s', api, [exc, bytes(body[:200])])
+            raise self.record_failure(ApiError('decode', f'Response from {api} is invalid: {exc}')) from exc
+        finally:
+            self.record_timing('json_decode', started)
+        self.record_success()
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug('Request %s result: %s', api, [result, kwargs])
+        if result.get('errorCode') == '500009':
+            msg = result.get('errorMessage') or '登陆失效'
+            raise ApiError('auth', msg, result=result)
         return result
 
+    @staticmethod
+    async def read_body(api: str, res: aiohttp.ClientResponse | web.Request):
+        """Read the raw body bytes, refusing anything over MAX_RESPONSE_SIZE."""
+        if (res.content_length or 0) > MAX_RESPONSE_SIZE:
+            raise ApiError('size', f'Response from {api} is too large: {res.content_length} bytes')
+        body = bytearray()
+        async for chunk in res.content.iter_any():
+            body += chunk
+            if len(body) > MAX_RESPONSE_SIZE:
+                raise ApiError('size', f'Response from {api} exceeds {MAX_RESPONSE_SIZE} bytes')
+        return body
+
     def get_sign(self, timestamp, nonce):
         sign_str = (self.access_token +
                     str(timestamp) +
                     nonce +
-                    self.client_id +
-                    self.client_secret +
-                    sgmwappcode +
-                    sgmwappversion +
-                    sgmwsystem +
-                    sgmwsystemversion)
+                    self._sign_tail)
         return hashlib.sha256(sign_str.encode()).hexdigest().lower()
 
-    def decode(self, data: dict) -> dict:
+    def decode(self, data: dict, converters=None) -> dict:
         payload = {}
-        for conv in self.converters:
-            prop = conv.prop or conv.attr
-            value = get_value(data, prop, None)
-            if prop is None:
-                continue
-            conv.decode(self, payload, value)
+        for conv in converters or self.converters:
+            conv.decode(self, payload, conv.get_value(data))
+            if conv.keep_valid:
+                self.keep_valid(conv, payload)
         return payload
 
-    def push_state(self, value: dict):
-        if not value:
+    @callback
+    def async_update_listeners(self):
+        if not self.last_update_success:
+            # entities were written as unavailable, rewrite all of them on recovery
+            self._force_push = True
+            super().async_update_listeners()
+            return
+        if self._snapshot_stale and not self._force_push:
+            # nothing new from the car, only the client state moved on
+            self._snapshot_stale = False
+            self._refreshed_sections.clear()
+            self.push_client_state()
             return
-        attrs = value.keys()
+        self._snapshot_stale = False
+        self.discover_converters(self._refreshed_sections)
+        self._refreshed_sections = set()
+        # decode once per refresh and fan out to subscribed entities only
+        started = time.perf_counter()
+        payload = self.decode({**self.data, 'client': self.client_status})
+        self.record_timing('decode', started)
+        if self._optimistic:
+            self.confirm_optimistic(payload)
+        if self._force_push:
+            changed = payload.keys()
+        else:
+            changed = self.diff_payload(self.payload, payload)
+        self.payload = payload
+        self._force_push = False
+        if self.mqtt and changed:
+            self.mqtt.publish({k: payload[k] for k in changed})
+        started = time.perf_counter()
+        written = self.push_state(payload, changed)
+        # only a full dispatch is due for every entity, partial pushes suppress nothing
+        self.stats['writes_suppressed'] += self.added_entities - written
+        self.record_timing('dispatch', started)
+
+    @callback
+    def push_client_state(self):
+        payload = self.decode({'client': self.client_status}, self.client_converters)
+        self.push_state(payload, self.diff_payload(self.payload, payload))
+        self.payload.update(payload)
+
+    def keep_valid(self, conv: Converter, payload: dict):
+        """Replace a value that breaks the converter rules with the last valid one."""
+        value = payload.get(conv.attr)
+        last = self.last_valid.get(conv.attr)
+        if conv.is_valid(value) and self.plausible(conv, value, last):
+            self.last_valid[conv.attr] = value
+        elif last is not None:
+            payload[conv.attr] = last
+        else:
+            payload.pop(conv.attr, None)
+
+    def plausible(self, conv: Converter, value, last):
+        if conv.follows(value, last):
+            self._implausible.pop(conv.attr, None)
+            return True
+        # readings that keep agreeing with each other win over a bad last value
+        prev, count = self._implausible.get(conv.attr, (None, 0))
+        count = count + 1 if prev is not None and conv.follows(value, prev) else 1
+        if count >= KEEP_VALID_RECOVER:
+            _LOGGER.warning('Reset last valid %s of %s from %s to %s', conv.attr, self.vin_sort, last, value)
+            self._implausible.pop(conv.attr, None)
+            return True
+        self._implausible[conv.attr] = (value, count)
+        return False
 
-        for entity in self.entities.values():
-            if not hasattr(entity, 'subscribed_attrs'):
+    def discover_converters(self, refreshed):
+        """Activate lazy converters the car reports, prune the ones it does not."""
+        found = []
+        for attr, conv in list(self._lazy.items()):
+            if conv.get_value(self.data) is not None:
+                found.append(self._lazy.pop(attr))
                 continue
-            if not (entity.subscribed_attrs & attrs):
+            section = conv.path[0][0]
+            # only a fresh, non-empty section tells that the car lacks the field
+            if section not in refreshed or not self.data.get(section):
                 continue
-            entity.async_set_state(value)
+            self._lazy_misses[attr] += 1
+            if self._lazy_misses[attr] >= LAZY_PRUNE_REFRESHES:
+                self.prune_converter(self._lazy.pop(attr))
+        if not found:
+            return
+        self.converters += tuple(found)
+        self._active.update(c.attr for c in found)
+        for conv in found:
+            if platform := self._platforms.get(conv.domain):
+                add_entities, new_entity = platform
+                add_entities([new_entity(conv)])
+
+    def prune_converter(self, conv: Converter):
+        self.stats['converters_pruned'] += 1
+        # installs from before lazy setup still have the entity registered
+        registry = er.async_get(self.hass)
+        if entity_id := registry.async_get_entity_id(conv.domain, DOMAIN, self.unique_id(conv.attr)):
+            _LOGGER.info('Remove %s, the car does not report %s', entity_id, conv.prop)
+            registry.async_remove(entity_id)
+
+    def unique_id(self, attr: str):
+        return f'{DOMAIN}-{self.entry.entry_id}-{attr}'
+
+    def setup_platform(self, domain: str, add_entities, new_entity):
+        """Add the entities of a platform, lazy ones follow when discovered."""
+        self._platforms[domain] = (add_entities, new_entity)
+        add_entities([
+            new_entity(conv)
+            for conv in self.registry.entities(domain)
+            if conv.attr in self._active
+        ])
+
+    @staticmethod
+    def diff_payload(old: dict, new: dict):
+        missing = object()
+        return {
+            k for k, v in new.items()
+            if old.get(k, missing) != v
+        }
+
+    def push_state(self, value: dict, changed=None):
+        """Write the entities subscribed to the values, return how many were written."""
+        if not value:
+            return 0
+        if changed is None:
+            delta = value
+        else:
+            # entities only receive the values that changed
+            delta = {k: value[k] for k in changed if k in value}
+
+        targets = {}
+        for attr in delta:
+            for entity in self.listeners.get(attr, ()):
+                targets[entity.attr] = entity
+        written = 0
+        for entity in targets.values():
+            entity.async_set_state(delta)
             if entity.added:
                 entity.async_write_ha_state()
+                written += 1
+        self.stats['writes'] += written
+        return written
 
     def subscribe_attrs(self, conv: Converter):
         attrs = {conv.attr}
         if conv.childs:
             attrs |= set(conv.childs)
-        attrs.update(c.attr for c in self.converters if c.parent == conv.attr)
+        attrs.update(self.registry.childs.get(conv.attr, ()))
         return attrs
 
+    def subscribe(self, entity: "XEntity"):
+        self.entities[entity.attr] = entity
+        for attr in entity.subscribed_attrs:
+            self.listeners.setdefault(attr, []).append(entity)
+
 
 class XEntity(CoordinatorEntity):
     log = _LOGGER
@@ -517,11 +1437,10 @@ class XEntity(CoordinatorEntity):
         self.attr = conv.attr
         self.hass = coordinator.hass
         self.entry = coordinator.entry
-        self._option = option or {}
-        if hasattr(conv, 'option'):
-            self._option.update(conv.option or {})
+        # resolved once, the update path never touches options again
+        self._option = {**(option or {}), **(conv.option or {})}
         self.entity_id = f'{conv.domain}.{coordinator.vin_sort}_{conv.attr}'
-        self._attr_unique_id = f'{DOMAIN}-{self.entry.entry_id}-{self.attr}'
+        self._attr_unique_id = coordinator.unique_id(conv.attr)
         self._attr_icon = self._option.get('icon')
         self._attr_device_class = self._option.get('device_class')
         self._attr_entity_picture = self._option.get('entity_picture')
@@ -536,7 +1455,7 @@ class XEntity(CoordinatorEntity):
         self._attr_extra_state_attributes = {}
         self._vars = {}
         self.subscribed_attrs = coordinator.subscribe_attrs(conv)
-        coordinator.entities[conv.attr] = self
+        coordinator.subscribe(self)
 
     @property
     def vin(self):
@@ -550,7 +1469,15 @@ class XEntity(CoordinatorEntity):
                 self.async_restore_last_state(state.state, state.attributes)
 
         self.added = True
-        self.update()
+        self.coordinator.added_entities += 1
+        if self.coordinator.payload:
+            self.async_set_state(self.coordinator.payload)
+
+    async def async_will_remove_from_hass(self):
+        await super().async_will_remove_from_hass()
+        if self.added:
+            self.added = False
+            self.coordinator.added_entities -= 1
 
     @callback
     def async_restore_last_state(self, state: str, attrs: dict):
@@ -558,20 +1485,14 @@ class XEntity(CoordinatorEntity):
 
     @callback
     def async_set_state(self, data: dict):
-        if hasattr(self.conv, 'option'):
-            self._option.update(self.conv.option or {})
         if self.attr in data:
             self._attr_state = data[self.attr]
-            self._attr_entity_picture = self._option.get('entity_picture')
-        for k in self.subscribed_attrs:
-            if k not in data:
-                continue
-            self._attr_extra_state_attributes[k] = data[k]
-
-    def update(self):
-        payload = self.coordinator.decode(self.coordinator.data)
-        self.coordinator.push_state(payload)
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        self.update()
\ No newline at end of file
+        attrs = self._attr_extra_state_attributes
+        if len(data) < len(self.subscribed_attrs):
+            for k, v in data.items():
+                if k in self.subscribed_attrs:
+                    attrs[k] = v
+        else:
+            for k in self.subscribed_attrs:
+                if k in data:
+                    attrs[k] = data[k]
@@ -16,10 +16,10 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
-        async_add_entities([BinarySensorEntity(coordinator, conv)])
+    coordinator.setup_platform(
+        ENTITY_DOMAIN, async_add_entities,
+        lambda conv: BinarySensorEntity(coordinator, conv),
+    )
 
 
 class BinarySensorEntity(XEntity, BaseEntity):
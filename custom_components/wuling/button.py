@@ -14,11 +14,12 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, entry, async_add_entities):
     attrs = []
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
+
+    def new_entity(conv):
         attrs.append(conv.attr)
-        async_add_entities([ButtonEntity(coordinator, conv)])
+        return ButtonEntity(coordinator, conv)
+
+    coordinator.setup_platform(ENTITY_DOMAIN, async_add_entities, new_entity)
     _LOGGER.info('async_setup_entry: %s', [ENTITY_DOMAIN, attrs])
 
 
@@ -20,10 +20,10 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
-        async_add_entities([ClimateEntity(coordinator, conv)])
+    coordinator.setup_platform(
+        ENTITY_DOMAIN, async_add_entities,
+        lambda conv: ClimateEntity(coordinator, conv),
+    )
 
 
 class ClimateEntity(XEntity, BaseEntity):
@@ -40,6 +40,10 @@ class ClimateEntity(XEntity, BaseEntity):
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
     _attr_target_temperature_step = 1
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ac_intent = {}  # fields of A/C commands still waiting in the queue
+
     @property
     def car_status(self):
         return self.coordinator.car_status or {}
@@ -65,17 +69,21 @@ class ClimateEntity(XEntity, BaseEntity):
         ret = False
         if ATTR_TEMPERATURE in kwargs:
             num = kwargs[ATTR_TEMPERATURE]
-            if ret := await self.async_ac_control(temperature=num):
+            optimistic = {'target_temperature': float(num)}
+            if ret := await self.async_ac_control(optimistic=optimistic, temperature=num):
                 self._attr_target_temperature = num
+                self.async_write_ha_state()
         return ret
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Handle HVAC mode changes with fixed payloads for COOL/HEAT."""
         ret = None
+        optimistic = {self.attr: f'{hvac_mode}'}
         if hvac_mode == HVACMode.OFF:
-            ret = await self.async_ac_control(accOnOff='0', status='0')
+            ret = await self.async_ac_control(optimistic=optimistic, accOnOff='0', status='0')
         elif hvac_mode == HVACMode.COOL:
             ret = await self._fixed_request(
+                optimistic=optimistic,
                 temperature="17",
                 status="1",
                 blowerLvl="7",
@@ -84,6 +92,7 @@ class ClimateEntity(XEntity, BaseEntity):
             )
         elif hvac_mode == HVACMode.HEAT:
             ret = await self._fixed_request(
+                optimistic=optimistic,
                 temperature="33",
                 status="1",
                 blowerLvl="7",
@@ -95,25 +104,34 @@ class ClimateEntity(XEntity, BaseEntity):
 
         if ret:
             self._attr_hvac_mode = hvac_mode
+            self.async_write_ha_state()
         return ret
 
     async def async_set_fan_mode(self, fan_mode: str):
         """Set new target fan mode."""
         if await self.async_ac_control(blowerLvl=fan_mode):
             self._attr_fan_mode = fan_mode
+            self.async_write_ha_state()
 
-    async def async_ac_control(self, **kwargs):
+    async def async_ac_control(self, optimistic=None, **kwargs):
         """Generic A/C control: use current entity state as fallback."""
-        result = await self.coordinator.async_request('car/control/acc', json={
-            'accOnOff': '1',
-            'duration': '10',
-            'blowerLvl': str(self.fan_mode or 3),
-            'temperature': str(self.target_temperature or 23),
-            **kwargs,
-        }) or {}
+        # queued fields have not reached the entity state yet, they win over the fallback
+        self._ac_intent.update(kwargs)
+        try:
+            result = await self.coordinator.async_control('car/control/acc', json={
+                'accOnOff': '1',
+                'duration': '10',
+                'blowerLvl': str(self.fan_mode or 3),
+                'temperature': str(self.target_temperature or 23),
+                **self._ac_intent,
+            }, optimistic=optimistic) or {}
+        finally:
+            for k, v in kwargs.items():
+                if self._ac_intent.get(k) == v:
+                    self._ac_intent.pop(k)
         return result.get('result')
 
-    async def _fixed_request(self, **fixed_json):
+    async def _fixed_request(self, optimistic=None, **fixed_json):
         """Send fixed JSON payload and return boolean result."""
-        result = await self.coordinator.async_request('car/control/acc', json=fixed_json) or {}
-        return result.get('result')
\ No newline at end of file
+        # through the intent, calls merging into the queued command keep the fixed fields
+        return await self.async_ac_control(optimistic=optimistic, **fixed_json)
\ No newline at end of file
@@ -1,6 +1,11 @@
 import voluptuous as vol
 from homeassistant import config_entries
-from . import DOMAIN, TITLE, CONF_ACCESS_TOKEN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, callback
+from homeassistant.components import webhook
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.helpers.network import NoURLAvailableError
+from . import (
+    DOMAIN, TITLE, CONF_ACCESS_TOKEN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_MQTT_TOPIC, CONF_MQTT_QOS, callback,
+)
 
 
 def get_schemas(defaults):
@@ -11,6 +16,13 @@ def get_schemas(defaults):
     })
 
 
+def get_option_schemas(defaults):
+    return vol.Schema({
+        vol.Optional(CONF_MQTT_TOPIC, default=defaults.get(CONF_MQTT_TOPIC) or ''): str,
+        vol.Optional(CONF_MQTT_QOS, default=defaults.get(CONF_MQTT_QOS) or 0): vol.In([0, 1, 2]),
+    })
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
@@ -32,6 +44,22 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={'tip': self.context.pop('tip', '')},
         )
 
+    async def async_step_reauth(self, entry_data):
+        self.context['tip'] = '登陆已失效，请重新抓包获取以下参数'
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        entry = self.hass.config_entries.async_get_entry(self.context['entry_id'])
+        if user_input is None:
+            user_input = {}
+        if user_input.get(CONF_ACCESS_TOKEN):
+            return self.async_update_reload_and_abort(entry, data={**entry.data, **user_input})
+        return self.async_show_form(
+            step_id='reauth_confirm',
+            data_schema=get_schemas({**entry.data, **user_input}),
+            description_placeholders={'tip': self.context.pop('tip', '')},
+        )
+
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry):
@@ -43,10 +71,16 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is None:
             user_input = {}
         if user_input.get(CONF_ACCESS_TOKEN):
+            options = {
+                **self.config_entry.options,
+                CONF_MQTT_TOPIC: user_input.pop(CONF_MQTT_TOPIC, '').strip(),
+                CONF_MQTT_QOS: user_input.pop(CONF_MQTT_QOS, 0),
+            }
+            # one update and so one reload, creating the entry below finds the options unchanged
             self.hass.config_entries.async_update_entry(
-                self.config_entry, data={**self.config_entry.data, **user_input}
+                self.config_entry, data={**self.config_entry.data, **user_input}, options=options,
             )
-            return self.async_create_entry(title='', data={})
+            return self.async_create_entry(title='', data=options)
         defaults = {
             **self.config_entry.data,
             **self.config_entry.options,
@@ -54,6 +88,19 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         }
         return self.async_show_form(
             step_id='init',
-            data_schema=get_schemas(defaults),
-            description_placeholders={'tip': self.context.pop('tip', '')},
+            data_schema=get_schemas(defaults).extend(get_option_schemas(defaults).schema),
+            description_placeholders={
+                'tip': self.context.pop('tip', ''),
+                'webhook_url': self.webhook_url(),
+            },
         )
+
+    def webhook_url(self):
+        """Push endpoint of the entry, keep it private: the id is its only secret."""
+        webhook_id = self.config_entry.data.get(CONF_WEBHOOK_ID)
+        if not webhook_id:
+            return '-'
+        try:
+            return webhook.async_generate_url(self.hass, webhook_id)
+        except NoURLAvailableError:
+            return webhook.async_generate_path(webhook_id)
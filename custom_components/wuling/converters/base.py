@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any, Optional, TYPE_CHECKING
 from homeassistant.const import EntityCategory
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
@@ -7,23 +8,40 @@ if TYPE_CHECKING:
     from .. import StateCoordinator as Client
 
 
-def get_value(obj, key, def_value=None):
-    keys = f'{key}'.split('.')
+def compile_path(key):
+    """Split a dotted property path once into (key, list index) segments."""
+    if key is None:
+        return ()
+    return tuple(
+        (k, int(k) if k.lstrip('-').isdigit() else None)
+        for k in f'{key}'.split('.')
+    )
+
+
+def get_path_value(obj, path, def_value=None):
     result = obj
-    for k in keys:
+    for key, idx in path:
         if result is None:
             return None
         if isinstance(result, dict):
-            result = result.get(k, def_value)
-        if isinstance(result, (list, tuple)):
+            result = result.get(key, def_value)
+        elif idx is not None and isinstance(result, (list, tuple)):
             try:
-                result = result[int(key)]
-            except Exception:
+                result = result[idx]
+            except IndexError:
                 result = def_value
+        else:
+            return def_value
     return result
 
 
-@dataclass
+def get_value(obj, key, def_value=None):
+    return get_path_value(obj, compile_path(key), def_value)
+
+
+# slotted dataclasses are rebuilt by the decorator, so zero-argument super()
+# does not work in their methods and the class has to be named explicitly
+@dataclass(slots=True)
 class Converter:
     attr: str  # hass attribute
     domain: Optional[str] = None  # hass domain
@@ -34,9 +52,25 @@ class Converter:
     enabled: Optional[bool] = True  # support: True, False, None (lazy setup)
     poll: bool = False  # hass should_poll
 
-    # don't init with dataclass because no type:
     childs: Optional[set] = None
-    option = None
+    option: Optional[dict] = None
+    keep_valid: bool = False  # invalid values fall back to the last valid one
+
+    # compiled from prop in __post_init__
+    path: tuple = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.path = compile_path(self.prop or self.attr)
+
+    def get_value(self, data: dict, def_value=None):
+        return get_path_value(data, self.path, def_value)
+
+    def is_valid(self, value: Any):
+        return value is not None
+
+    def follows(self, value: Any, last: Any):
+        """Whether a valid value is plausible after the last valid one."""
+        return True
 
     # to hass
     def decode(self, client: "Client", payload: dict, value: Any):
@@ -50,7 +84,7 @@ class Converter:
         self.option = option
         return self
 
-@dataclass
+@dataclass(slots=True)
 class BoolConv(Converter):
     reverse: bool = None
 
@@ -63,9 +97,9 @@ class BoolConv(Converter):
 
     def encode(self, device: "Client", payload: dict, value: bool):
         val = (not value) if self.reverse else value
-        super().encode(device, payload, int(val))
+        super(BoolConv, self).encode(device, payload, int(val))
 
-@dataclass
+@dataclass(slots=True)
 class MapConv(Converter):
     map: dict = None
     default: Any = None
@@ -75,28 +109,55 @@ class MapConv(Converter):
 
     def encode(self, device: "Client", payload: dict, value: Any):
         value = next(k for k, v in self.map.items() if v == value)
-        super().encode(device, payload, value)
+        super(MapConv, self).encode(device, payload, value)
 
-@dataclass
+@dataclass(slots=True)
 class SensorConv(Converter):
     domain: Optional[str] = 'sensor'
 
-@dataclass
+@dataclass(slots=True)
 class BinarySensorConv(BoolConv):
     domain: Optional[str] = 'binary_sensor'
 
+@dataclass(slots=True)
 class ProblemConv(BinarySensorConv):
     def __post_init__(self):
+        super(ProblemConv, self).__post_init__()
         self.option = {
             'device_class': BinarySensorDeviceClass.PROBLEM,
             'entity_category': EntityCategory.DIAGNOSTIC,
             **(self.option or {}),
         }
 
-@dataclass
+@dataclass(slots=True)
 class NumberSensorConv(SensorConv):
     ratio: Optional[float] = 1
     precision: Optional[int] = 1
+    # validity rules for keep_valid
+    nonzero: bool = False
+    valid_range: Optional[tuple] = None
+    # relative to the last valid value
+    increasing: bool = False
+    max_delta: Optional[float] = None
+
+    def is_valid(self, value: Any):
+        if value is None:
+            return False
+        if self.nonzero and not value:
+            return False
+        if self.valid_range:
+            low, high = self.valid_range
+            return low <= value <= high
+        return True
+
+    def follows(self, value: Any, last: Any):
+        if last is None:
+            return True
+        if self.increasing and value < last:
+            return False
+        if self.max_delta is not None and abs(value - last) > self.max_delta:
+            return False
+        return True
 
     def decode(self, client: "Client", payload: dict, value: Any):
         try:
@@ -107,11 +168,11 @@ class NumberSensorConv(SensorConv):
             val = None
         payload[self.attr] = val
 
-@dataclass
+@dataclass(slots=True)
 class MapSensorConv(MapConv, SensorConv):
     domain: Optional[str] = 'sensor'
 
-@dataclass
+@dataclass(slots=True)
 class ButtonConv(Converter):
     domain: Optional[str] = 'button'
     press: Optional[str] = ''
@@ -122,3 +183,35 @@ class ButtonConv(Converter):
                 return await getattr(client, self.press)()
             return False
         return press
+
+
+class ConverterRegistry:
+    """Immutable converter set with the lookups entities need precomputed."""
+
+    __slots__ = ('converters', 'by_attr', 'by_domain', 'childs')
+
+    def __init__(self, converters):
+        self.converters = tuple(converters)
+        by_domain = {}
+        childs = {}
+        for conv in self.converters:
+            if conv.parent:
+                childs.setdefault(conv.parent, []).append(conv.attr)
+            elif conv.domain:
+                by_domain.setdefault(conv.domain, []).append(conv)
+        self.by_attr = MappingProxyType({c.attr: c for c in self.converters})
+        self.by_domain = MappingProxyType({k: tuple(v) for k, v in by_domain.items()})
+        self.childs = MappingProxyType({k: tuple(v) for k, v in childs.items()})
+
+    def __iter__(self):
+        return iter(self.converters)
+
+    def __len__(self):
+        return len(self.converters)
+
+    def entities(self, domain: str):
+        """Top level converters of a domain, children become attributes."""
+        return self.by_domain.get(domain, ())
+
+    def pick(self, attrs):
+        return tuple(self.by_attr[a] for a in attrs if a in self.by_attr)
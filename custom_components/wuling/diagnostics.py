@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.diagnostics import async_redact_data
+
+from . import CONF_ACCESS_TOKEN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_WEBHOOK_ID
+
+TO_REDACT = {
+    CONF_ACCESS_TOKEN,
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_WEBHOOK_ID,
+    'vin',
+    'carPlate',
+    'latitude',
+    'longitude',
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    coordinator = hass.data[entry.entry_id]['coordinator']
+    return {
+        'entry': async_redact_data(dict(entry.data), TO_REDACT),
+        'options': async_redact_data(dict(entry.options), TO_REDACT),
+        'update_interval': str(coordinator.update_interval),
+        'client': coordinator.client_status,
+        'stats': dict(coordinator.stats),
+        'timings': {
+            k: v.as_dict()
+            for k, v in coordinator.timings.items()
+        },
+        'entities': len(coordinator.entities),
+        'data': async_redact_data(coordinator.data, TO_REDACT),
+    }
@@ -15,14 +15,13 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
+
+    def new_entity(conv):
         if conv.attr == 'door_lock':
-            entity = DoorLockEntity(coordinator, conv)
-        else:
-            entity = LockEntity(coordinator, conv)
-        async_add_entities([entity])
+            return DoorLockEntity(coordinator, conv)
+        return LockEntity(coordinator, conv)
+
+    coordinator.setup_platform(ENTITY_DOMAIN, async_add_entities, new_entity)
 
 
 class LockEntity(XEntity, BaseEntity):
@@ -35,10 +34,11 @@ class LockEntity(XEntity, BaseEntity):
 class DoorLockEntity(LockEntity):
     async def async_lock(self, **kwargs) -> None:
         """Turn the entity on."""
-        await self.coordinator.async_request('car/control/doorLock', json={
+        status = kwargs.get('status', 1)
+        await self.coordinator.async_control('car/control/doorLock', json={
             'vin': self.vin,
-            'status': kwargs.get('status', 1),
-        })
+            'status': status,
+        }, optimistic={self.attr: bool(status)})
 
     async def async_unlock(self, **kwargs) -> None:
         """Turn the entity off."""
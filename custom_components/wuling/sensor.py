@@ -14,10 +14,13 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
-        async_add_entities([SensorEntity(coordinator, conv)])
+
+    def new_entity(conv):
+        if conv.attr == 'api_status':
+            return ClientSensorEntity(coordinator, conv)
+        return SensorEntity(coordinator, conv)
+
+    coordinator.setup_platform(ENTITY_DOMAIN, async_add_entities, new_entity)
 
 class SensorEntity(XEntity, BaseEntity):
     def __init__(self, coordinator: StateCoordinator, conv: Converter):
@@ -34,3 +37,10 @@ class SensorEntity(XEntity, BaseEntity):
     def async_restore_last_state(self, state: str, attrs: dict):
         self._attr_native_value = attrs.get(self.attr, state)
         self._attr_extra_state_attributes.update(attrs)
+
+
+class ClientSensorEntity(SensorEntity):
+    @property
+    def available(self):
+        """Stay available to report the client state while the cloud is down."""
+        return True
@@ -0,0 +1,12 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# custom_components is imported from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
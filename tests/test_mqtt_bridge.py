@@ -0,0 +1,82 @@
+"""MqttBridge against the mocked MQTT client of the test harness."""
+import asyncio
+import json
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_mqtt_message
+
+import custom_components.wuling as wuling
+
+VIN = 'LZWADAGA1KB123456'
+PUSH_TOPIC = 'fleet/lzwada_123456/push'
+STATE_TOPIC = 'fleet/lzwada_123456/state'
+
+
+@pytest.fixture
+async def bridge(hass, mqtt_mock, monkeypatch):
+    monkeypatch.setattr(wuling, 'MQTT_BATCH_DELAY', 0.01)
+    entry = MockConfigEntry(
+        domain=wuling.DOMAIN, data={},
+        options={wuling.CONF_MQTT_TOPIC: 'fleet/', wuling.CONF_MQTT_QOS: 1},
+    )
+    entry.add_to_hass(hass)
+    coordinator = wuling.StateCoordinator(hass, entry)
+    coordinator.data.update({
+        'carInfo': {'vin': VIN},
+        'carStatus': {'acStatus': '0', 'batterySoc': '80', 'collectTime': 1700000000000},
+    })
+    # first dispatch, later ones only carry changes
+    coordinator.async_update_listeners()
+    bridge = wuling.MqttBridge(coordinator, 'fleet/', 1)
+    assert await bridge.async_start()
+    yield bridge
+    bridge.async_stop()
+
+
+def published(mqtt_mock):
+    return [
+        (call.args[0], json.loads(call.args[1]), call.args[2])
+        for call in mqtt_mock.async_publish.call_args_list
+    ]
+
+
+async def test_pushes_are_ingested_and_deltas_batched(hass, mqtt_mock, bridge):
+    coordinator = bridge.coordinator
+    assert coordinator.mqtt is bridge
+    async_fire_mqtt_message(hass, PUSH_TOPIC, json.dumps({'carStatus': {'acStatus': '2', 'batterySoc': '77'}}))
+    async_fire_mqtt_message(hass, PUSH_TOPIC, json.dumps({
+        'vin': VIN, 'carStatus': {'acStatus': '1', 'collectTime': 1700000100000},
+    }))
+    await hass.async_block_till_done()
+    assert coordinator.payload['ac'] == 'cool'
+    assert coordinator.stats['pushes'] == 2
+    await asyncio.sleep(0.05)
+    await hass.async_block_till_done()
+
+    assert len(published(mqtt_mock)) == 1
+    topic, payload, qos = published(mqtt_mock)[0]
+    assert (topic, qos) == (STATE_TOPIC, 1)
+    assert payload['ac'] == 'cool'
+    assert payload['battery'] == 77.0
+    assert 'total_mileage' not in payload
+
+
+async def test_foreign_or_invalid_pushes_are_ignored(hass, mqtt_mock, bridge):
+    coordinator = bridge.coordinator
+    async_fire_mqtt_message(hass, PUSH_TOPIC, json.dumps({'vin': 'LZWADAGA1KB999999', 'carStatus': {'acStatus': '1'}}))
+    async_fire_mqtt_message(hass, PUSH_TOPIC, b'not json')
+    async_fire_mqtt_message(hass, PUSH_TOPIC, json.dumps({'carStatus': 'off'}))
+    await asyncio.sleep(0.05)
+    await hass.async_block_till_done()
+    assert coordinator.stats['pushes'] == 0
+    assert coordinator.payload['ac'] == 'off'
+    assert published(mqtt_mock) == []
+
+
+async def test_stop_drops_the_pending_batch(hass, mqtt_mock, bridge):
+    bridge.publish({'ac': 'heat'})
+    bridge.async_stop()
+    await asyncio.sleep(0.05)
+    await hass.async_block_till_done()
+    assert bridge.coordinator.mqtt is None
+    assert published(mqtt_mock) == []
@@ -0,0 +1,51 @@
+"""Polls answered from an older cloud snapshot never roll pushed state back."""
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+import custom_components.wuling as wuling
+
+VIN = 'LZWADAGA1KB123456'
+T0, T1, T2, T3 = (1700000000000 + i * 60000 for i in range(4))
+
+
+def status(collect_time, soc):
+    return {'carStatus': {'vin': VIN, 'batterySoc': soc, 'collectTime': collect_time}}
+
+
+async def make_coordinator(hass, cloud: dict):
+    entry = MockConfigEntry(domain=wuling.DOMAIN, data={})
+    entry.add_to_hass(hass)
+    coordinator = wuling.StateCoordinator(hass, entry)
+    coordinator.data.update({'carInfo': {'vin': VIN}, **status(T0, '80')})
+    coordinator.async_update_listeners()
+
+    async def async_request(api, **kwargs):
+        return {'data': cloud.get(api, {})}
+
+    coordinator.async_request = async_request
+    return coordinator
+
+
+async def test_older_poll_keeps_the_pushed_status(hass):
+    cloud = {'userCarRelation/queryDefaultCarStatus': {'carInfo': {'vin': VIN}, **status(T1, '90')}}
+    coordinator = await make_coordinator(hass, cloud)
+    coordinator.ingest_push(status(T2, '70'))
+    assert coordinator.payload['battery'] == 70.0
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.data['carStatus']['collectTime'] == T2
+    assert coordinator.payload['battery'] == 70.0
+    assert coordinator.stats['sections_outdated'] == 1
+
+    # a newer snapshot from the cloud still wins
+    cloud['userCarRelation/queryDefaultCarStatus'] = status(T3, '60')
+    await coordinator.async_refresh()
+    assert coordinator.payload['battery'] == 60.0
+
+
+async def test_older_push_is_ignored(hass):
+    coordinator = await make_coordinator(hass, {})
+    coordinator.ingest_push(status(T2, '70'))
+    coordinator.ingest_push(status(T1, '90'))
+    assert coordinator.payload['battery'] == 70.0
+    assert coordinator.stats['pushes'] == 2